@@ -0,0 +1,142 @@
+# backend/app/cache.py
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def make_key(namespace: str, params: Dict[str, Any]) -> str:
+    """Build a cache key that ignores parameter order and string case/padding."""
+    normalized = {
+        k: v.strip().lower() if isinstance(v, str) else v
+        for k, v in params.items()
+        if v is not None
+    }
+    return f"{namespace}:{json.dumps(normalized, sort_keys=True, default=str)}"
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+    size: int
+
+
+class ResponseCache:
+    """In-process LRU cache with per-call TTLs and stale-while-revalidate.
+
+    Entries past their TTL but within ``stale_ttl`` are returned immediately
+    while a single background task refreshes them. The cache is bounded by
+    entry count and by the total of the sizes reported for each value.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 0, stale_ttl: float = 3600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _store(self, key: str, value: Any, ttl: float, size: int):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+        self._entries[key] = _Entry(value, time.monotonic() + ttl, size)
+        self._bytes += size
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self.evictions += 1
+
+    def _lookup(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+        now = time.monotonic()
+        if now > entry.expires_at + self.stale_ttl:
+            del self._entries[key]
+            self._bytes -= entry.size
+            return None, False
+        self._entries.move_to_end(key)
+        return entry, now > entry.expires_at
+
+    async def _fetch_and_store(self, key, fetch, ttl, size_of, cacheable, ttl_of):
+        value = await fetch()
+        if cacheable is None or cacheable(value):
+            self._store(key, value, ttl_of(value) if ttl_of else ttl, size_of(value) if size_of else 0)
+        return value
+
+    def _refresh(self, key, fetch, ttl, size_of, cacheable, ttl_of):
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                await self._fetch_and_store(key, fetch, ttl, size_of, cacheable, ttl_of)
+            except Exception as e:
+                logger.warning(f"Background refresh failed for {key}: {str(e)}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(refresh())
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl: float,
+        size_of: Optional[Callable[[Any], int]] = None,
+        cacheable: Optional[Callable[[Any], bool]] = None,
+        ttl_of: Optional[Callable[[Any], float]] = None,
+    ) -> Any:
+        """Cached value for ``key``, fetching it on a miss.
+
+        ``ttl_of`` gives a fetched value its own TTL in place of ``ttl``, for
+        values that come from another cache with part of their lifetime used.
+        """
+        entry, stale = self._lookup(key)
+        if entry is None:
+            self.misses += 1
+            return await self._fetch_and_store(key, fetch, ttl, size_of, cacheable, ttl_of)
+        if stale:
+            self.stale_hits += 1
+            self._refresh(key, fetch, ttl, size_of, cacheable, ttl_of)
+        else:
+            self.hits += 1
+        return entry.value
+
+    def fresh(self, key: str) -> bool:
+        """Whether ``key`` is cached and within its TTL, without counting a lookup."""
+        entry = self._entries.get(key)
+        return entry is not None and time.monotonic() <= entry.expires_at
+
+    async def close(self):
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+        }
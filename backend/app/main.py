@@ -1,37 +1,65 @@
 # backend/app/main.py
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-import requests
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 import os
-from datetime import datetime, date, timedelta
+from datetime import datetime
 from dotenv import load_dotenv
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict
+from contextlib import asynccontextmanager
 import logging
-import urllib.parse
-from groq import Groq
-import json
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, From, To, Subject, HtmlContent
+
+# Load .env before importing services, which read their settings at import
+load_dotenv()
 
 # Import models and services
 from app.models import (
-    FlightRequest, HotelRequest, ItineraryRequest, EmailRequest,
-    FlightSegment, FlightOption, TimeSlot, DailyPlan, GeneratedItinerary
+    FlightRequest, FareCalendarRequest, MultiCityRequest, PlanTripRequest, HotelRequest, HotelRankRequest, ItineraryRequest, EmailRequest, BulkEmailRequest,
+    FlightOption, GeneratedItinerary
 )
-from app.utils import format_time, calculate_time_slots, clean_hotel_data
+from app.disk_cache import disk_cache
+from app.metrics import CONTENT_TYPE, MetricsMiddleware
+from app.outbox import outbox
 from app.services import (
     flight_service,
     hotel_service,
+    hotel_results,
     itinerary_service,
-    email_service
+    email_service,
+    flight_results,
+    flight_pairing,
+    multi_city_service,
+    fare_calendar_service,
+    batch_service,
+    plan_trip_service,
+    metrics_service,
+    serpapi_client
 )
+from app.services.itinerary_stream import stream_chunked_itinerary, stream_itinerary_service
+from app.services.semantic_cache import semantic_cache
+from app.services.model_registry import model_registry
+from app.services.model_dispatcher import model_dispatcher
+from app.services.hotel_prefetch import hotel_prefetcher
+from app.services.email_renderer import render_cache
+from app.services.email_sender import email_sender
 
 # Initialize
-load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await model_registry.start()
+    await email_sender.start()
+    yield
+    await email_sender.stop()
+    await model_registry.stop()
+    await hotel_prefetcher.stop()
+    await serpapi_client.close_client()
+    disk_cache.close()
+    outbox.close()
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 
 # Load API keys
 SERPAPI_KEY = os.getenv("SERPAPI_API_KEY")
@@ -41,25 +69,145 @@ if not SERPAPI_KEY:
 if not GROQ_KEY:
     raise ValueError("Missing GROQ_API_KEY")
 
-# Initialize Groq client
-groq_client = Groq(api_key=GROQ_KEY)
-
 # Endpoints
 @app.post("/search_flights", response_model=Dict[str, List[FlightOption]])
-def search_flights(request: FlightRequest):
-    return flight_service.search_flights_service(request)
+async def search_flights(request: FlightRequest):
+    # The parser already emits FlightOption-shaped dicts; returning a Response
+    # skips FastAPI validating every option a second time
+    flight_options = await flight_service.search_flights_service(request)
+    search_id = await flight_results.index_search(request, flight_options)
+    # Most flight searches are followed by a hotel search for the same trip
+    hotel_service.prefetch_hotels(request)
+    return JSONResponse(flight_options, headers={"X-Search-Id": search_id})
+
+@app.get("/search_flights/{search_id}/results")
+async def flight_results_page(
+    search_id: str,
+    leg: str = "outbound",
+    sort: str = "price",
+    descending: bool = False,
+    max_stops: Optional[int] = Query(None, ge=0),
+    max_price: Optional[float] = None,
+    depart_after: Optional[int] = Query(None, ge=0, le=24),
+    depart_before: Optional[int] = Query(None, ge=0, le=24),
+    airline: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(10, ge=1, le=100)
+):
+    return await flight_results.results_page_service(
+        search_id, leg=leg, sort=sort, descending=descending, page=page, page_size=page_size,
+        max_stops=max_stops, max_price=max_price, depart_after=depart_after,
+        depart_before=depart_before, airline=airline
+    )
+
+@app.get("/search_flights/{search_id}/pairs")
+async def flight_pairs(
+    search_id: str,
+    sort: str = "price",
+    k: int = Query(10, ge=1, le=100),
+    max_total_price: Optional[float] = None,
+    max_stops: Optional[int] = Query(None, ge=0),
+    min_layover_minutes: Optional[int] = Query(None, ge=0)
+):
+    return await flight_pairing.pairs_service(
+        search_id, sort=sort, k=k, max_total_price=max_total_price,
+        max_stops=max_stops, min_layover_minutes=min_layover_minutes
+    )
+
+@app.post("/search_multi_city")
+async def search_multi_city(request: MultiCityRequest):
+    return JSONResponse(await multi_city_service.multi_city_service(request))
+
+@app.post("/fare_calendar")
+async def fare_calendar(request: FareCalendarRequest):
+    # Date errors are raised here, before the response starts streaming
+    rows = fare_calendar_service.fare_calendar_service(request)
+    return StreamingResponse(rows, media_type="application/x-ndjson")
 
 @app.post("/search_hotels")
-def search_hotels(request: HotelRequest):
-    return hotel_service.search_hotels_service(request)
+async def search_hotels(request: HotelRequest):
+    hotels = await hotel_service.search_hotels_service(request)
+    search_id = hotel_results.result_store.put(request, hotels["hotels"])
+    return JSONResponse(hotels, headers={"X-Search-Id": search_id})
+
+@app.post("/search_hotels/{search_id}/rank")
+def rank_hotels(search_id: str, weights: HotelRankRequest):
+    return hotel_results.rank_hotels_service(search_id, weights)
+
+@app.post("/search_hotels/stream")
+async def search_hotels_stream(request: HotelRequest, max_pages: int = Query(3, ge=1, le=10)):
+    return StreamingResponse(hotel_service.stream_hotels_service(request, max_pages=max_pages),
+                             media_type="application/x-ndjson")
+
+@app.post("/batch/search_flights")
+async def batch_search_flights(batch: List[FlightRequest], stream: bool = False):
+    results = batch_service.batch_flights(batch, stream=stream)
+    if stream:
+        return StreamingResponse(results, media_type="application/x-ndjson")
+    return JSONResponse(await results)
+
+@app.post("/batch/search_hotels")
+async def batch_search_hotels(batch: List[HotelRequest], stream: bool = False):
+    results = batch_service.batch_hotels(batch, stream=stream)
+    if stream:
+        return StreamingResponse(results, media_type="application/x-ndjson")
+    return JSONResponse(await results)
 
 @app.post("/generate_itinerary", response_model=GeneratedItinerary)
-def generate_itinerary(request: ItineraryRequest):
-    return itinerary_service.generate_itinerary_service(request)
+async def generate_itinerary(request: ItineraryRequest):
+    return await itinerary_service.generate_itinerary_service(request)
+
+@app.post("/generate_itinerary/stream")
+def generate_itinerary_stream(request: ItineraryRequest):
+    if itinerary_service.use_chunked(request):
+        # Chunk calls run concurrently on the event loop
+        return StreamingResponse(stream_chunked_itinerary(request), media_type="application/x-ndjson")
+    # The generator blocks on Groq, so StreamingResponse iterates it in the threadpool
+    return StreamingResponse(stream_itinerary_service(request), media_type="application/x-ndjson")
+
+@app.post("/plan_trip")
+async def plan_trip(request: PlanTripRequest):
+    # Flights, hotels and the itinerary stream out in whatever order they finish
+    parts = plan_trip_service.plan_trip_service(request)
+    return StreamingResponse(parts, media_type="application/x-ndjson")
+
+@app.post("/send_itinerary_email", status_code=202)
+async def send_itinerary_email(request: EmailRequest):
+    # Accepted for delivery; poll /emails/{message_id} for the outcome
+    return await email_service.send_itinerary_email_service(request)
+
+@app.post("/send_itinerary_email/bulk", status_code=202)
+async def send_bulk_itinerary_email(request: BulkEmailRequest):
+    return await email_service.send_bulk_itinerary_email_service(request)
+
+@app.get("/emails/{message_id}")
+async def email_status(message_id: str):
+    return await email_service.email_status_service(message_id)
+
+@app.get("/stats")
+def stats():
+    return {
+        "search_cache": serpapi_client.response_cache.stats(),
+        "disk_cache": disk_cache.stats(),
+        "semantic_cache": semantic_cache.stats(),
+        "coalescing": {
+            "serpapi": serpapi_client.inflight.stats(),
+            "groq": itinerary_service.inflight.stats(),
+        },
+        "serpapi_rate_limit": serpapi_client.rate_limiter.stats(),
+        "batch": batch_service.stats(),
+        "hotel_prefetch": hotel_prefetcher.stats(),
+        "email_render_cache": render_cache.stats(),
+        "email_outbox": outbox.stats(),
+        "email_sender": email_sender.stats(),
+        "groq_models": model_registry.stats(),
+        "groq_dispatch": model_dispatcher.stats(),
+    }
 
-@app.post("/send_itinerary_email")
-def send_itinerary_email(request: EmailRequest):
-    return email_service.send_itinerary_email_service(request)
+@app.get("/metrics")
+async def metrics():
+    # Async so the threadpool gauges are read on the event loop
+    return PlainTextResponse(await metrics_service.metrics_service(), media_type=CONTENT_TYPE)
 
 @app.get("/health")
 def health_check():
@@ -1,5 +1,5 @@
 # backend/app/models.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 
 class FlightRequest(BaseModel):
@@ -11,12 +11,50 @@ class FlightRequest(BaseModel):
     nonstop: bool = False
     search_return: bool = False
 
+class FareCalendarRequest(BaseModel):
+    origin: str
+    destination: str
+    outbound_date: str
+    return_date: str
+    # Days either side of each date to price
+    outbound_flex: int = Field(3, ge=0, le=5)
+    return_flex: int = Field(3, ge=0, le=5)
+    cabin_class: str = "economy"
+    nonstop: bool = False
+
+class MultiCityRequest(BaseModel):
+    # Airport codes in travel order; the first is where the trip starts
+    cities: List[str] = Field(min_length=2, max_length=6)
+    # Departure date of each leg, one fewer than cities
+    dates: List[str]
+    # Days either side of each leg's date to consider
+    flex_days: int = Field(0, ge=0, le=3)
+    cabin_class: str = "economy"
+    nonstop: bool = False
+    sort: str = "price"
+    max_total_price: Optional[float] = None
+    max_total_duration: Optional[int] = None
+    # Minimum minutes between landing and the next leg's departure
+    min_connection_minutes: int = Field(120, ge=0)
+    top_n: int = Field(5, ge=1, le=50)
+
 class HotelRequest(BaseModel):
     location: str
     check_in_date: str
     check_out_date: str
     stars: Optional[int] = None
 
+class HotelRankRequest(BaseModel):
+    # Relative weights; only their ratios matter
+    price_weight: float = Field(1.0, ge=0)
+    rating_weight: float = Field(1.0, ge=0)
+    stars_weight: float = Field(0.5, ge=0)
+    distance_weight: float = Field(0.0, ge=0)
+    # Point to measure distance from, e.g. a venue or the arrival airport
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    k: int = Field(10, ge=1, le=100)
+
 class ItineraryRequest(BaseModel):
     destination: str
     duration: int
@@ -24,12 +62,41 @@ class ItineraryRequest(BaseModel):
     budget: str
     travel_style: str
     arrival_time: Optional[str] = None
+    # None chunks trips of CHUNKED_MIN_DAYS or more when that is set, otherwise not
+    chunked: Optional[bool] = None
+
+class PlanTripRequest(BaseModel):
+    origin: str
+    destination: str
+    outbound_date: str
+    return_date: str
+    cabin_class: str = "economy"
+    nonstop: bool = False
+    # City to search hotels and plan in; defaults to the destination
+    location: Optional[str] = None
+    stars: Optional[int] = None
+    interests: List[str] = ["Sightseeing", "Food & Dining"]
+    budget: str = "Mid-range"
+    travel_style: str = "Balanced"
+    # Skip waiting for flights when the arrival time is already known
+    arrival_time: Optional[str] = None
 
 class EmailRequest(BaseModel):
     email: str
     itinerary: Dict[str, Any]
     personal_message: Optional[str] = None
 
+class BulkEmailRecipient(BaseModel):
+    email: str
+    name: Optional[str] = Field(None, max_length=200)
+    # Overrides the request's personal_message for this recipient
+    personal_message: Optional[str] = Field(None, max_length=2000)
+
+class BulkEmailRequest(BaseModel):
+    recipients: List[BulkEmailRecipient] = Field(min_length=1, max_length=1000)
+    itinerary: Dict[str, Any]
+    personal_message: Optional[str] = Field(None, max_length=2000)
+
 class FlightSegment(BaseModel):
     airline: str
     flight_number: str
@@ -0,0 +1,8 @@
+# backend/app/ndjson.py
+import json
+from typing import Any
+
+
+def event(kind: str, data: Any = None) -> str:
+    """One line of an NDJSON stream: ``{"type": kind, "data": data}``."""
+    return json.dumps({"type": kind, "data": data}) + "\n"
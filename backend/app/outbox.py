@@ -0,0 +1,158 @@
+# backend/app/outbox.py
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("id", "recipient", "status", "attempts", "last_error", "created_at", "updated_at", "sent_at")
+
+
+class Outbox:
+    """Durable queue of outgoing emails in a local SQLite database.
+
+    A message is ``queued`` until a sender claims it, which marks it
+    ``sending`` with a lease. It ends ``sent`` or ``failed``, or returns to
+    ``queued`` with a later ``next_attempt_at`` to be retried. A lease that
+    runs out, because the process died mid-send, makes the message claimable
+    again, so nothing is lost across restarts and several worker processes
+    can share one file. Finished messages are kept until ``purge`` removes
+    them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                "id TEXT PRIMARY KEY, recipient TEXT NOT NULL, payload TEXT NOT NULL, "
+                "status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+                "next_attempt_at REAL NOT NULL, lease_until REAL, last_error TEXT, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL, sent_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS outbox_done ON outbox (status, updated_at)")
+            self._conn = conn
+        return self._conn
+
+    def add(self, recipient: str, payload: Dict[str, Any]) -> str:
+        return self.add_many([(recipient, payload)])[0]
+
+    def add_many(self, messages: List[Tuple[str, Dict[str, Any]]]) -> List[str]:
+        """Queue ``(recipient, payload)`` messages in one transaction."""
+        now = time.time()
+        rows = [(uuid.uuid4().hex, recipient, json.dumps(payload), now, now, now) for recipient, payload in messages]
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(
+                    "INSERT INTO outbox (id, recipient, payload, status, next_attempt_at, created_at, updated_at) "
+                    "VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                    rows,
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return [row[0] for row in rows]
+
+    def claim(self, lease: float, max_attempts: int) -> Optional[Dict[str, Any]]:
+        """Atomically take the next due message, or None if nothing is due.
+
+        A lease that ran out on the last allowed attempt fails the message
+        instead of handing it out again, so a payload that takes its sender
+        down with it is not retried forever.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "UPDATE outbox SET status = 'failed', lease_until = NULL, "
+                "last_error = 'Lease ran out on the last attempt', updated_at = ? "
+                "WHERE status = 'sending' AND lease_until <= ? AND attempts >= ?",
+                (now, now, max_attempts),
+            )
+            row = conn.execute(
+                "UPDATE outbox SET status = 'sending', lease_until = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE id = ("
+                "  SELECT id FROM outbox"
+                "  WHERE (status = 'queued' AND next_attempt_at <= ?)"
+                "     OR (status = 'sending' AND lease_until <= ?)"
+                "  ORDER BY next_attempt_at LIMIT 1"
+                ") RETURNING id, payload, attempts",
+                (now + lease, now, now, now),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"id": row[0], "payload": json.loads(row[1]), "attempts": row[2]}
+
+    def mark_sent(self, message_id: str):
+        now = time.time()
+        with self._lock:
+            self._connect().execute(
+                "UPDATE outbox SET status = 'sent', lease_until = NULL, last_error = NULL, "
+                "sent_at = ?, updated_at = ? WHERE id = ?",
+                (now, now, message_id),
+            )
+
+    def retry_later(self, message_id: str, delay: float, error: str):
+        now = time.time()
+        with self._lock:
+            self._connect().execute(
+                "UPDATE outbox SET status = 'queued', lease_until = NULL, next_attempt_at = ?, "
+                "last_error = ?, updated_at = ? WHERE id = ?",
+                (now + delay, error, now, message_id),
+            )
+
+    def mark_failed(self, message_id: str, error: str):
+        with self._lock:
+            self._connect().execute(
+                "UPDATE outbox SET status = 'failed', lease_until = NULL, last_error = ?, updated_at = ? "
+                "WHERE id = ?",
+                (error, time.time(), message_id),
+            )
+
+    def purge(self, before: float) -> int:
+        """Delete sent and failed messages last updated before ``before``."""
+        with self._lock:
+            cursor = self._connect().execute(
+                "DELETE FROM outbox WHERE status IN ('sent', 'failed') AND updated_at < ?", (before,)
+            )
+        return cursor.rowcount
+
+    def get(self, message_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connect().execute(
+                f"SELECT {', '.join(COLUMNS)} FROM outbox WHERE id = ?", (message_id,)
+            ).fetchone()
+        return dict(zip(COLUMNS, row)) if row else None
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._connect().execute("SELECT status, COUNT(*) FROM outbox GROUP BY status"))
+        return {status: counts.get(status, 0) for status in ("queued", "sending", "sent", "failed")}
+
+
+outbox = Outbox(path=os.getenv("EMAIL_OUTBOX_PATH", ".cache/email_outbox.sqlite3"))
@@ -0,0 +1,55 @@
+# backend/app/ratelimit.py
+import asyncio
+import time
+from typing import Any, Dict
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` calls per second with bursts up to ``burst``.
+
+    Each caller reserves a token immediately, letting the balance go
+    negative, and then sleeps until its reservation is covered. Waiters are
+    therefore released in arrival order without holding a lock while they
+    sleep. A rate of zero or less disables limiting.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int = 1):
+        self.name = name
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self.acquired = 0
+        self.delayed = 0
+        self.wait_seconds = 0.0
+
+    async def acquire(self):
+        self.acquired += 1
+        if self.rate <= 0:
+            return
+        # No await between reading and updating the balance, so this is
+        # atomic with respect to other tasks on the loop
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        if self._tokens < 0:
+            wait = -self._tokens / self.rate
+            self.delayed += 1
+            self.wait_seconds += wait
+            await asyncio.sleep(wait)
+
+    def available(self) -> float:
+        """Tokens that could be spent right now without waiting."""
+        if self.rate <= 0:
+            return float(self.burst)
+        return min(self.burst, self._tokens + (time.monotonic() - self._updated) * self.rate)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "acquired": self.acquired,
+            "delayed": self.delayed,
+            "wait_seconds": round(self.wait_seconds, 3),
+        }
@@ -0,0 +1,77 @@
+import os
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Sequence
+from fastapi import HTTPException
+from app import ndjson
+from app.models import FlightRequest, HotelRequest
+from app.services import flight_results
+from app.services.hotel_service import search_hotels_service
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+
+# Shared by every batch on this worker, so two large batches can't each
+# claim the full allowance; SerpAPI's own rate limit applies underneath
+_slots = asyncio.Semaphore(int(os.getenv("BATCH_CONCURRENCY", "16")))
+_active = 0
+
+def check_size(items: Sequence[Any]):
+    if not items:
+        raise HTTPException(400, "Batch is empty")
+    if len(items) > MAX_ITEMS:
+        raise HTTPException(400, f"Batch is limited to {MAX_ITEMS} items")
+
+async def _hotel_item(request: HotelRequest) -> Dict[str, Any]:
+    return await search_hotels_service(request)
+
+async def _run(index: int, item: Any, fn: Callable[[Any], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+    global _active
+    async with _slots:
+        _active += 1
+        try:
+            return {"index": index, "ok": True, "result": await fn(item)}
+        except HTTPException as e:
+            return {"index": index, "ok": False, "status": e.status_code, "error": e.detail}
+        except Exception as e:
+            logger.error(f"Batch item {index} failed: {str(e)}")
+            return {"index": index, "ok": False, "status": 500, "error": str(e)}
+        finally:
+            _active -= 1
+
+def _summary(results: List[Dict[str, Any]]) -> Dict[str, int]:
+    succeeded = sum(1 for r in results if r["ok"])
+    return {"total": len(results), "succeeded": succeeded, "failed": len(results) - succeeded}
+
+async def run_batch(items: Sequence[Any], fn) -> Dict[str, Any]:
+    results = await asyncio.gather(*(_run(i, item, fn) for i, item in enumerate(items)))
+    return {**_summary(results), "results": results}
+
+async def stream_batch(items: Sequence[Any], fn) -> AsyncIterator[str]:
+    """Yield one NDJSON line per item in completion order, then a summary."""
+    tasks = [asyncio.create_task(_run(i, item, fn)) for i, item in enumerate(items)]
+    results = []
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            result = await next_result
+            results.append(result)
+            yield ndjson.event("item", result)
+    finally:
+        # Client went away: stop the rest of the batch
+        for task in tasks:
+            task.cancel()
+    yield ndjson.event("done", _summary(results))
+
+def batch_flights(requests: List[FlightRequest], stream: bool = False):
+    check_size(requests)
+    search = flight_results.search_with_id
+    return stream_batch(requests, search) if stream else run_batch(requests, search)
+
+def batch_hotels(requests: List[HotelRequest], stream: bool = False):
+    check_size(requests)
+    return stream_batch(requests, _hotel_item) if stream else run_batch(requests, _hotel_item)
+
+def stats() -> Dict[str, Any]:
+    return {"active": _active, "max_items": MAX_ITEMS}
@@ -0,0 +1,166 @@
+# backend/app/services/email_renderer.py
+import os
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+from string import Template
+from typing import Any, Dict, Optional
+
+# Shared inline styles, substituted into the templates once at import
+_STYLES = {
+    "accent": "color: #0066cc;",
+    "li": "margin-bottom: 5px;",
+    "ul": "padding-left: 20px;",
+    "panel": "flex: 1; padding: 10px; background: #f0f8ff; border-radius: 5px;",
+}
+
+def _compile(text: str) -> str:
+    """Compile a ``$name`` fragment into a ``str.format`` string.
+
+    Shared styles are filled in here, once; the remaining names become
+    format fields, so rendering is a C-level ``format`` call per fragment.
+    """
+    template = Template(text.replace("{", "{{").replace("}", "}}"))
+    return template.substitute({name: _STYLES.get(name, "{%s}" % name) for name in template.get_identifiers()})
+
+_HEAD = _compile(
+    '<html><body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">'
+    '<div style="max-width: 600px; margin: 0 auto; padding: 20px;">'
+    '<h1 style="$accent">✈️ Your Travel Itinerary to $destination</h1>'
+)
+_SUMMARY = _compile('<p style="font-size: 16px;">$summary</p>')
+_NOTE = _compile(
+    '<p style="background: #f0f8ff; padding: 10px; border-radius: 5px;">'
+    '<strong>Personal Note:</strong> $message</p>'
+)
+_GREETING = _compile('<p style="font-size: 16px;">Hi $name,</p>')
+_PLANS_HEADING = _compile(
+    '<h2 style="$accent border-bottom: 2px solid #0066cc; padding-bottom: 5px;">📅 Daily Plans</h2>'
+)
+_DAY_OPEN = _compile(
+    '<div style="margin-bottom: 25px; border: 1px solid #ddd; border-radius: 5px; padding: 15px; background: #f9f9f9;">'
+    '<h3 style="$accent">Day $day: $date</h3>'
+)
+_ARRIVAL = _compile('<p><strong>✈️ Flight Arrival:</strong> $arrival</p>')
+_SLOT_OPEN = _compile(
+    '<div style="margin: 15px 0;">'
+    '<h4 style="$accent margin-bottom: 5px;">$name ($time)</h4>'
+    '<ul style="margin-top: 5px; $ul">'
+)
+_SLOT_CLOSE = "</ul></div>"
+_HIGHLIGHTS = _compile('<p style="margin-top: 10px;"><strong>🌟 Highlights:</strong> $highlights</p>')
+_DAY_CLOSE = "</div>"
+_LISTS_OPEN = _compile(
+    '<div style="display: flex; margin-top: 30px;">'
+    '<div style="$panel margin-right: 10px;"><h3 style="$accent">🧳 Packing List</h3><ul style="$ul">'
+)
+_TIPS_OPEN = _compile('</ul></div><div style="$panel"><h3 style="$accent">💡 Local Tips</h3><ul style="$ul">')
+_FOOT = _compile(
+    '</ul></div></div>'
+    '<p style="margin-top: 30px; text-align: center; font-style: italic;">'
+    'Happy travels! ✈️🌍<br><span style="$accent">Travel Planner Pro</span></p>'
+    '</div></body></html>'
+)
+_LI_OPEN = _compile('<li style="$li">')
+_LI_BETWEEN = "</li>" + _LI_OPEN
+
+def render_intro(name: Optional[str] = None, personal_message: Optional[str] = None) -> str:
+    """Greeting and personal note for one recipient of a shared body."""
+    intro = _GREETING.format(name=name) if name else ""
+    if personal_message:
+        intro += _NOTE.format(message=personal_message)
+    return intro
+
+def render_html(itinerary: Dict[str, Any], personal_message: Optional[str] = None,
+                note_html: Optional[str] = None) -> str:
+    """Render the itinerary email body in one pass.
+
+    ``note_html``, if given, is written verbatim where the personal note
+    goes; bulk sends put a per-recipient substitution tag there.
+
+    Fragments are appended to one list and joined once at the end, which
+    measured faster than writing to an ``io.StringIO``.
+    """
+    parts = []
+    write = parts.append
+
+    def items(values):
+        if values:
+            write(_LI_OPEN)
+            write(_LI_BETWEEN.join(map(str, values)))
+            write("</li>")
+
+    write(_HEAD.format(destination=itinerary.get("destination", "your destination")))
+    if itinerary.get("summary"):
+        write(_SUMMARY.format(summary=itinerary["summary"]))
+    if note_html is not None:
+        write(note_html)
+    elif personal_message:
+        write(_NOTE.format(message=personal_message))
+
+    write(_PLANS_HEADING)
+    for day in itinerary.get("daily_plans", []):
+        write(_DAY_OPEN.format(day=day["day"], date=day.get("date", "")))
+        if day.get("arrival_info"):
+            write(_ARRIVAL.format(arrival=day["arrival_info"]))
+        for slot_name, slot in day.get("time_slots", {}).items():
+            write(_SLOT_OPEN.format(name=slot_name.title(), time=slot["time"]))
+            items(slot.get("activities", []))
+            write(_SLOT_CLOSE)
+        if day.get("highlights"):
+            write(_HIGHLIGHTS.format(highlights=", ".join(day["highlights"])))
+        write(_DAY_CLOSE)
+
+    write(_LISTS_OPEN)
+    items(itinerary.get("packing_list", []))
+    write(_TIPS_OPEN)
+    items(itinerary.get("local_tips", []))
+    write(_FOOT)
+    return "".join(parts)
+
+class RenderCache:
+    """LRU of rendered bodies keyed by a hash of itinerary and message."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def content_hash(itinerary: Dict[str, Any], personal_message: Optional[str],
+                     note_html: Optional[str] = None) -> str:
+        # Pickling is several times cheaper than a canonical JSON dump. Equal
+        # content built in a different key order only costs a miss, never a
+        # wrong body, since equal bytes unpickle to equal content.
+        return hashlib.sha256(pickle.dumps((itinerary, personal_message, note_html), protocol=5)).hexdigest()
+
+    def render(self, itinerary: Dict[str, Any], personal_message: Optional[str] = None,
+               note_html: Optional[str] = None) -> str:
+        key = self.content_hash(itinerary, personal_message, note_html)
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return html
+            self.misses += 1
+        html = render_html(itinerary, personal_message, note_html)
+        with self._lock:
+            self._entries[key] = html
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return html
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+render_cache = RenderCache(max_entries=int(os.getenv("EMAIL_RENDER_CACHE_SIZE", "256")))
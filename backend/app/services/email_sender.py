@@ -0,0 +1,166 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+import httpx
+from app import metrics
+from app.outbox import outbox
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+DEFAULT_SENDGRID_URL = "https://api.sendgrid.com/v3/mail/send"
+
+class EmailSender:
+    """Worker pool that drains the outbox to SendGrid's v3 mail/send API.
+
+    Every worker shares one keep-alive client. 429s, 5xx responses and
+    network errors are retried with exponential backoff and jitter until
+    ``max_attempts``; any other error fails the message straight away.
+    Workers sleep until ``wake`` is called or ``poll_interval`` passes, so
+    retries that come due are picked up without a new message arriving.
+    Sent and failed messages are purged from the outbox once they are
+    ``retention`` seconds old; ``0`` keeps them.
+    """
+
+    def __init__(self, workers: int = 4, max_attempts: int = 6, backoff_base: float = 2,
+                 backoff_max: float = 300, lease: float = 60, poll_interval: float = 1,
+                 retention: float = 604800, purge_interval: float = 3600):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.purge_interval = purge_interval
+        self._client: Optional[httpx.AsyncClient] = None
+        self._tasks: List[asyncio.Task] = []
+        self._purger: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.purged = 0
+        self.in_flight = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=float(os.getenv("SENDGRID_TIMEOUT", "10")),
+                limits=httpx.Limits(max_connections=self.workers, max_keepalive_connections=self.workers),
+            )
+        return self._client
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        if self.retention > 0:
+            self._purger = asyncio.create_task(self._purge_loop())
+
+    async def stop(self):
+        tasks = self._tasks + ([self._purger] if self._purger is not None else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._purger = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def backoff(self, attempts: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _worker(self):
+        while True:
+            message = await asyncio.to_thread(outbox.claim, self.lease, self.max_attempts)
+            if message is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+            await self._process(message)
+
+    async def purge(self) -> int:
+        purged = await asyncio.to_thread(outbox.purge, time.time() - self.retention)
+        self.purged += purged
+        return purged
+
+    async def _purge_loop(self):
+        while True:
+            try:
+                purged = await self.purge()
+                if purged:
+                    logger.info(f"Purged {purged} finished emails from the outbox")
+            except Exception as e:
+                logger.warning(f"Outbox purge failed: {str(e)}")
+            await asyncio.sleep(self.purge_interval)
+
+    async def _process(self, message: Dict[str, Any]):
+        self.in_flight += 1
+        try:
+            await self._deliver(message)
+        except Exception as e:
+            # Count a crash as an attempt, so a payload that always crashes ends up failed
+            logger.error(f"Email {message['id']} delivery crashed: {str(e)}")
+            await self._settle(message, f"Delivery crashed: {type(e).__name__}: {str(e)}", True)
+        finally:
+            self.in_flight -= 1
+
+    async def _deliver(self, message: Dict[str, Any]):
+        retryable = True
+        started = time.perf_counter()
+        try:
+            res = await self._get_client().post(
+                os.getenv("SENDGRID_API_URL", DEFAULT_SENDGRID_URL),
+                json=message["payload"],
+                headers={"Authorization": f"Bearer {os.getenv('SENDGRID_API_KEY')}"},
+            )
+            metrics.observe_upstream("sendgrid", "mail_send", str(res.status_code), time.perf_counter() - started)
+            if res.status_code in (200, 202):
+                await asyncio.to_thread(outbox.mark_sent, message["id"])
+                self.sent += 1
+                return
+            error = f"SendGrid error: {res.status_code} - {res.text[:500]}"
+            retryable = res.status_code == 429 or res.status_code >= 500
+        except httpx.HTTPError as e:
+            metrics.observe_upstream("sendgrid", "mail_send", type(e).__name__, time.perf_counter() - started)
+            error = f"SendGrid request failed: {type(e).__name__}: {str(e)}"
+        await self._settle(message, error, retryable)
+
+    async def _settle(self, message: Dict[str, Any], error: str, retryable: bool):
+        if retryable and message["attempts"] < self.max_attempts:
+            self.retried += 1
+            await asyncio.to_thread(outbox.retry_later, message["id"], self.backoff(message["attempts"]), error)
+        else:
+            self.failed += 1
+            logger.error(f"Email {message['id']} failed: {error}")
+            await asyncio.to_thread(outbox.mark_failed, message["id"], error)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._tasks),
+            "in_flight": self.in_flight,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "purged": self.purged,
+        }
+
+email_sender = EmailSender(
+    workers=int(os.getenv("EMAIL_SENDER_WORKERS", "4")),
+    max_attempts=int(os.getenv("EMAIL_MAX_ATTEMPTS", "6")),
+    backoff_base=float(os.getenv("EMAIL_BACKOFF_BASE", "2")),
+    backoff_max=float(os.getenv("EMAIL_BACKOFF_MAX", "300")),
+    retention=float(os.getenv("EMAIL_OUTBOX_RETENTION", "604800")),
+)
@@ -1,90 +1,119 @@
 # backend/app/services/email_service.py
 import os
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, From, To, Subject, HtmlContent
+import re
+import asyncio
 from fastapi import HTTPException
 import logging
+from app.outbox import outbox
+from app.services.email_renderer import render_cache, render_intro
+from app.services.email_sender import email_sender
 
 logger = logging.getLogger(__name__)
 
-def send_itinerary_email_service(request):
+# SendGrid takes at most 1000 personalizations in one mail/send call
+BULK_BATCH_SIZE = min(1000, int(os.getenv("EMAIL_BULK_BATCH_SIZE", "1000")))
+# Replaced per recipient with their greeting and personal note
+INTRO_TAG = "-travel-planner-intro-"
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+def _sendgrid_payload(itinerary, personalizations, html_content: str):
+    """SendGrid v3 mail/send body; each personalization is its own email."""
+    sender = {"email": os.getenv("SENDGRID_FROM_EMAIL")}
+    if os.getenv("SENDGRID_FROM_NAME"):
+        sender["name"] = os.getenv("SENDGRID_FROM_NAME")
+    return {
+        "personalizations": personalizations,
+        "from": sender,
+        "subject": f"Your Travel Itinerary to {itinerary.get('destination', 'your destination')}",
+        "content": [{"type": "text/html", "value": html_content}]
+    }
+
+async def send_itinerary_email_service(request):
+    """Queue the itinerary email and return its message ID.
+
+    Delivery happens in the background sender, so a slow SendGrid never
+    holds up the request.
+    """
+    try:
+        # Compiled templates, and identical itineraries are rendered once
+        html_content = render_cache.render(request.itinerary, request.personal_message)
+        payload = _sendgrid_payload(request.itinerary, [{"to": [{"email": request.email}]}], html_content)
+        message_id = await asyncio.to_thread(outbox.add, request.email, payload)
+        email_sender.wake()
+        return {"status": "queued", "message_id": message_id}
+
+    except Exception as e:
+        logger.error(f"Email queueing error: {str(e)}")
+        raise HTTPException(500, f"Failed to queue email: {str(e)}")
+
+def _accepted_recipients(request):
+    """Per-recipient status in request order, and the recipients to send to.
+
+    Malformed and repeated addresses are reported here rather than sent,
+    since SendGrid rejects a whole call for one bad personalization.
+    """
+    statuses, accepted, seen = [], [], set()
+    for recipient in request.recipients:
+        address = recipient.email.strip()
+        if not EMAIL_PATTERN.match(address):
+            statuses.append({"email": recipient.email, "status": "rejected", "error": "Invalid email address"})
+        elif address.lower() in seen:
+            statuses.append({"email": recipient.email, "status": "duplicate"})
+        else:
+            seen.add(address.lower())
+            status = {"email": address, "status": "queued"}
+            statuses.append(status)
+            accepted.append((status, recipient))
+    return statuses, accepted
+
+async def send_bulk_itinerary_email_service(request):
+    """Queue one itinerary for a group of recipients.
+
+    The body is rendered once. Recipients are sent ``BULK_BATCH_SIZE`` to a
+    SendGrid call, one personalization each; names and personal notes go in
+    through a substitution, so the shared body is not rendered per person.
+    Each recipient's status links to the outbox message of their batch.
+    """
+    statuses, accepted = _accepted_recipients(request)
+    if not accepted:
+        raise HTTPException(422, "No valid recipients")
+
     try:
-        # Create email content
-        html_content = f"""
-        <html>
-            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                    <h1 style="color: #0066cc;">✈️ Your Travel Itinerary to {request.itinerary.get('destination', 'your destination')}</h1>
-                    
-                    {f'<p style="font-size: 16px;">{request.itinerary.get("summary", "")}</p>' if request.itinerary.get("summary") else ''}
-                    
-                    {f'<p style="background: #f0f8ff; padding: 10px; border-radius: 5px;"><strong>Personal Note:</strong> {request.personal_message}</p>' if request.personal_message else ''}
-                    
-                    <h2 style="color: #0066cc; border-bottom: 2px solid #0066cc; padding-bottom: 5px;">📅 Daily Plans</h2>
-                    
-                    {''.join([
-                        f"""
-                        <div style="margin-bottom: 25px; border: 1px solid #ddd; border-radius: 5px; padding: 15px; background: #f9f9f9;">
-                            <h3 style="color: #0066cc;">Day {day['day']}: {day.get('date', '')}</h3>
-                            {f'<p><strong>✈️ Flight Arrival:</strong> {day.get("arrival_info", "")}</p>' if day.get("arrival_info") else ''}
-                            
-                            {''.join([
-                                f"""
-                                <div style="margin: 15px 0;">
-                                    <h4 style="color: #0066cc; margin-bottom: 5px;">{slot_name.title()} ({slot['time']})</h4>
-                                    <ul style="margin-top: 5px; padding-left: 20px;">
-                                        {''.join([f'<li style="margin-bottom: 5px;">{activity}</li>' for activity in slot.get("activities", [])])}
-                                    </ul>
-                                </div>
-                                """ for slot_name, slot in day.get('time_slots', {}).items()
-                            ])}
-                            
-                            {f'<p style="margin-top: 10px;"><strong>🌟 Highlights:</strong> {", ".join(day.get("highlights", []))}</p>' if day.get("highlights") else ''}
-                        </div>
-                        """ for day in request.itinerary.get('daily_plans', [])
-                    ])}
-                    
-                    <div style="display: flex; margin-top: 30px;">
-                        <div style="flex: 1; padding: 10px; background: #f0f8ff; border-radius: 5px; margin-right: 10px;">
-                            <h3 style="color: #0066cc;">🧳 Packing List</h3>
-                            <ul style="padding-left: 20px;">
-                                {''.join([f'<li style="margin-bottom: 5px;">{item}</li>' for item in request.itinerary.get('packing_list', [])])}
-                            </ul>
-                        </div>
-                        
-                        <div style="flex: 1; padding: 10px; background: #f0f8ff; border-radius: 5px;">
-                            <h3 style="color: #0066cc;">💡 Local Tips</h3>
-                            <ul style="padding-left: 20px;">
-                                {''.join([f'<li style="margin-bottom: 5px;">{tip}</li>' for tip in request.itinerary.get('local_tips', [])])}
-                            </ul>
-                        </div>
-                    </div>
-                    
-                    <p style="margin-top: 30px; text-align: center; font-style: italic;">
-                        Happy travels! ✈️🌍<br>
-                        <span style="color: #0066cc;">Travel Planner Pro</span>
-                    </p>
-                </div>
-            </body>
-        </html>
-        """
-
-        # Create SendGrid email
-        message = Mail(
-            from_email=From(os.getenv("SENDGRID_FROM_EMAIL"), os.getenv("SENDGRID_FROM_NAME")),
-            to_emails=To(request.email),
-            subject=Subject(f"Your Travel Itinerary to {request.itinerary.get('destination', 'your destination')}"),
-            html_content=HtmlContent(html_content))
-        
-        # Send email
-        sg = SendGridAPIClient(os.getenv("SENDGRID_API_KEY"))
-        response = sg.send(message)
-        
-        if response.status_code == 202:
-            return {"status": "success", "message": "Itinerary sent successfully"}
+        personalized = any(r.name or r.personal_message for _, r in accepted)
+        if personalized:
+            html_content = render_cache.render(request.itinerary, note_html=INTRO_TAG)
         else:
-            raise Exception(f"SendGrid error: {response.status_code} - {response.body}")
+            html_content = render_cache.render(request.itinerary, request.personal_message)
+
+        messages = []
+        for start in range(0, len(accepted), BULK_BATCH_SIZE):
+            batch = accepted[start:start + BULK_BATCH_SIZE]
+            personalizations = []
+            for status, recipient in batch:
+                to = {"email": status["email"]}
+                if recipient.name:
+                    to["name"] = recipient.name
+                personalization = {"to": [to]}
+                if personalized:
+                    intro = render_intro(recipient.name, recipient.personal_message or request.personal_message)
+                    personalization["substitutions"] = {INTRO_TAG: intro}
+                personalizations.append(personalization)
+            recipients = ", ".join(status["email"] for status, _ in batch)
+            messages.append((recipients, _sendgrid_payload(request.itinerary, personalizations, html_content)))
+
+        message_ids = await asyncio.to_thread(outbox.add_many, messages)
+        email_sender.wake()
 
     except Exception as e:
-        logger.error(f"Email sending error: {str(e)}")
-        raise HTTPException(500, f"Failed to send email: {str(e)}")
\ No newline at end of file
+        logger.error(f"Bulk email queueing error: {str(e)}")
+        raise HTTPException(500, f"Failed to queue emails: {str(e)}")
+
+    for index, (status, _) in enumerate(accepted):
+        status["message_id"] = message_ids[index // BULK_BATCH_SIZE]
+    return {"status": "queued", "message_ids": message_ids, "recipients": statuses}
+
+async def email_status_service(message_id: str):
+    message = await asyncio.to_thread(outbox.get, message_id)
+    if message is None:
+        raise HTTPException(404, "Message not found")
+    return message
@@ -0,0 +1,106 @@
+import os
+import asyncio
+import logging
+from datetime import datetime, date, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional
+from fastapi import HTTPException
+from app import ndjson
+from app.models import FareCalendarRequest
+from app.services import serpapi_client
+from app.services.flight_service import _leg_params
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+CONCURRENCY = int(os.getenv("FARE_CALENDAR_CONCURRENCY", "6"))
+
+def _window(center: date, flex: int) -> List[date]:
+    return [center + timedelta(days=offset) for offset in range(-flex, flex + 1)]
+
+def lowest_price(data: Dict[str, Any]) -> Optional[float]:
+    """Cheapest round-trip fare in one google_flights payload."""
+    insight = (data.get("price_insights") or {}).get("lowest_price")
+    if isinstance(insight, (int, float)):
+        return float(insight)
+    prices = [
+        flight["price"]
+        for flight in (data.get("best_flights") or []) + (data.get("other_flights") or [])
+        if isinstance(flight.get("price"), (int, float))
+    ]
+    return float(min(prices)) if prices else None
+
+async def _cell_price(request: FareCalendarRequest, outbound: date, inbound: date,
+                      limit: asyncio.Semaphore) -> Optional[float]:
+    if inbound <= outbound or outbound < date.today():
+        return None
+    params = _leg_params(request, request.origin, request.destination,
+                         outbound.isoformat(), inbound.isoformat())
+    async with limit:
+        try:
+            # Same params as /search_flights, so its caches and coalescing apply
+            return lowest_price(await serpapi_client.search(params))
+        except Exception as e:
+            logger.warning(f"Fare calendar cell {outbound} -> {inbound} failed: {str(e)}")
+            return None
+
+async def _row(request: FareCalendarRequest, outbound: date, returns: List[date],
+               limit: asyncio.Semaphore) -> Dict[str, Any]:
+    prices = await asyncio.gather(*(_cell_price(request, outbound, inbound, limit) for inbound in returns))
+    return {"outbound_date": outbound.isoformat(), "prices": list(prices)}
+
+async def _stream(request: FareCalendarRequest, outbounds: List[date],
+                  returns: List[date]) -> AsyncIterator[str]:
+    limit = asyncio.Semaphore(CONCURRENCY)
+    yield ndjson.event("dates", {
+        "outbound_dates": [d.isoformat() for d in outbounds],
+        "return_dates": [d.isoformat() for d in returns]
+    })
+
+    tasks = [asyncio.create_task(_row(request, outbound, returns, limit)) for outbound in outbounds]
+    rows = {}
+    try:
+        # Rows go out in completion order; the slowest date only delays its own row
+        for next_row in asyncio.as_completed(tasks):
+            row = await next_row
+            rows[row["outbound_date"]] = row["prices"]
+            yield ndjson.event("row", row)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    matrix = [rows[d.isoformat()] for d in outbounds]
+    cheapest = None
+    for i, prices in enumerate(matrix):
+        for j, price in enumerate(prices):
+            if price is not None and (cheapest is None or price < cheapest["price"]):
+                cheapest = {
+                    "outbound_date": outbounds[i].isoformat(),
+                    "return_date": returns[j].isoformat(),
+                    "price": price
+                }
+    yield ndjson.event("summary", {
+        "outbound_dates": [d.isoformat() for d in outbounds],
+        "return_dates": [d.isoformat() for d in returns],
+        "matrix": matrix,
+        "cheapest": cheapest
+    })
+    yield ndjson.event("done")
+
+def fare_calendar_service(request: FareCalendarRequest) -> AsyncIterator[str]:
+    """Validate the window up front, then stream the price matrix as NDJSON.
+
+    Errors found here still become a normal HTTP error; once streaming has
+    started a failed date only leaves ``null`` cells in its row.
+    """
+    try:
+        outbound = datetime.strptime(request.outbound_date, "%Y-%m-%d").date()
+        inbound = datetime.strptime(request.return_date, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(400, "Dates must be YYYY-MM-DD")
+    if inbound <= outbound:
+        raise HTTPException(400, "Return date must be after departure")
+
+    outbounds = [d for d in _window(outbound, request.outbound_flex) if d >= date.today()]
+    if not outbounds:
+        raise HTTPException(400, "Departure date must be in future")
+    return _stream(request, outbounds, _window(inbound, request.return_flex))
@@ -0,0 +1,102 @@
+import heapq
+import logging
+from typing import Any, Dict, List, Optional
+import numpy as np
+from fastapi import HTTPException
+from app.services.flight_results import FlightResultSet, result_store
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+PAIR_SORT_KEYS = ("price", "duration")
+
+def _ranked(leg: FlightResultSet, sort: str, max_stops: Optional[int]) -> np.ndarray:
+    """Indices of a leg's usable options, cheapest (or shortest) first.
+
+    Options without a price are dropped for either sort, since a pair's
+    total price can't be given for them.
+    """
+    cost = leg.price if sort == "price" else leg.duration.astype(np.float64)
+    mask = ~np.isnan(cost) & ~np.isnan(leg.price)
+    if max_stops is not None:
+        mask &= leg.stops <= max_stops
+    matches = np.flatnonzero(mask)
+    return matches[np.argsort(cost[matches], kind="stable")]
+
+def k_best_pairs(outbound: FlightResultSet, inbound: FlightResultSet, k: int = 10, sort: str = "price",
+                 max_total_price: Optional[float] = None, max_stops: Optional[int] = None,
+                 min_layover_minutes: Optional[int] = None) -> List[tuple]:
+    """The ``k`` best (outbound, return) index pairs by summed price or duration.
+
+    Both legs are sorted once; pairs are then drawn from a heap over the
+    sorted positions, starting at (0, 0) and pushing each popped pair's two
+    successors. Pairs come out in cost order, so only about ``k`` plus the
+    rejected pairs are ever looked at, rather than every combination.
+
+    The stay at the destination, from the outbound's arrival to the return's
+    departure, must be at least ``min_layover_minutes``. Pairs whose times
+    are unknown are kept unless a minimum is given.
+    """
+    out_order = _ranked(outbound, sort, max_stops)
+    ret_order = _ranked(inbound, sort, max_stops)
+    if not len(out_order) or not len(ret_order):
+        return []
+
+    column = "price" if sort == "price" else "duration"
+    out_cost = getattr(outbound, column)[out_order].astype(np.float64).tolist()
+    ret_cost = getattr(inbound, column)[ret_order].astype(np.float64).tolist()
+    out_price, ret_price = outbound.price[out_order].tolist(), inbound.price[ret_order].tolist()
+    out_arrives, ret_departs = outbound.arrives_at[out_order].tolist(), inbound.departs_at[ret_order].tolist()
+    required_stay = min_layover_minutes or 0
+
+    pairs = []
+    heap = [(out_cost[0] + ret_cost[0], 0, 0)]
+    seen = {(0, 0)}
+    while heap and len(pairs) < k:
+        cost, x, y = heapq.heappop(heap)
+        total_price = out_price[x] + ret_price[y]
+        if sort == "price" and max_total_price is not None and cost > max_total_price:
+            # Every remaining pair costs at least this much
+            break
+
+        stay = ret_departs[y] - out_arrives[x]
+        if stay != stay:  # NaN: a time was missing
+            stay_ok = min_layover_minutes is None
+        else:
+            stay_ok = stay >= required_stay
+        price_ok = max_total_price is None or total_price <= max_total_price
+        if stay_ok and price_ok:
+            pairs.append((int(out_order[x]), int(ret_order[y]), total_price, None if stay != stay else stay))
+
+        for nx, ny in ((x + 1, y), (x, y + 1)):
+            if nx < len(out_cost) and ny < len(ret_cost) and (nx, ny) not in seen:
+                seen.add((nx, ny))
+                heapq.heappush(heap, (out_cost[nx] + ret_cost[ny], nx, ny))
+    return pairs
+
+async def pairs_service(search_id: str, sort: str = "price", k: int = 10,
+                        max_total_price: Optional[float] = None, max_stops: Optional[int] = None,
+                        min_layover_minutes: Optional[int] = None) -> Dict[str, Any]:
+    if sort not in PAIR_SORT_KEYS:
+        raise HTTPException(400, f"sort must be one of {', '.join(PAIR_SORT_KEYS)}")
+    legs = await result_store.get(search_id)
+    outbound, inbound = legs["outbound"], legs["return"]
+    if not inbound.options:
+        raise HTTPException(400, "Search has no return flights; search with search_return enabled")
+
+    pairs = k_best_pairs(outbound, inbound, k=k, sort=sort, max_total_price=max_total_price,
+                         max_stops=max_stops, min_layover_minutes=min_layover_minutes)
+    return {
+        "search_id": search_id,
+        "sort": sort,
+        "pairs": [
+            {
+                "outbound": outbound.options[i],
+                "return": inbound.options[j],
+                "total_price": total_price,
+                "total_duration": int(outbound.duration[i]) + int(inbound.duration[j]),
+                "stay_minutes": None if stay is None else int(stay)
+            }
+            for i, j, total_price, stay in pairs
+        ]
+    }
@@ -0,0 +1,53 @@
+from functools import lru_cache
+from typing import Any, Dict, List
+from app.utils import format_time
+
+# SerpAPI repeats the same handful of departure/arrival times across a
+# result set, so formatting each distinct value once is enough
+format_time_cached = lru_cache(maxsize=4096)(format_time)
+
+_FARE_RULES = {
+    "cancellation": "Free within 24h",
+    "baggage": "1 checked + 1 cabin"
+}
+
+def parse_leg(data: Dict[str, Any], cabin_class: str) -> List[Dict[str, Any]]:
+    """Turn one google_flights payload into ``FlightOption``-shaped dicts.
+
+    Walks every flight and segment once, without building Pydantic models;
+    the output matches ``FlightOption`` field for field so it can be sent as
+    JSON without being validated again.
+    """
+    amenities = ["entertainment"] if cabin_class != "economy" else []
+    options = []
+    for flight in data.get("best_flights", []):
+        segments = []
+        for segment in flight.get("flights", []):
+            departure = segment.get("departure_airport") or {}
+            arrival = segment.get("arrival_airport") or {}
+            segments.append({
+                "airline": segment.get("airline", "Unknown"),
+                "flight_number": segment.get("flight_number", "N/A"),
+                "departure_airport": departure.get("name", "N/A"),
+                "departure_terminal": departure.get("terminal"),
+                "departure_time": format_time_cached(departure.get("time")),
+                "arrival_airport": arrival.get("name", "N/A"),
+                "arrival_terminal": arrival.get("terminal"),
+                "arrival_time": format_time_cached(arrival.get("time")),
+                "duration": int(segment.get("duration", 0)),
+                "aircraft": segment.get("aircraft", "Unknown"),
+                "baggage": segment.get("baggage", "1 x 15kg"),
+                "cabin_class": cabin_class,
+                "amenities": list(amenities)
+            })
+
+        ads = flight.get("travel_ads") or [{}]
+        options.append({
+            "total_price": f"₹{flight.get('price', 'N/A')}",
+            "total_duration": int(flight.get("total_duration", 0)),
+            "stops": len(segments) - 1,
+            "segments": segments,
+            "booking_link": ads[0].get("link", "#"),
+            "fare_rules": dict(_FARE_RULES)
+        })
+    return options
@@ -0,0 +1,185 @@
+import os
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+import numpy as np
+from fastapi import HTTPException
+from app.cache import make_key
+from app.disk_cache import disk_cache
+from app.models import FlightRequest
+from app.services.flight_service import search_flights_service
+from app.services.serpapi_client import cache_ttl
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+SORT_KEYS = ("price", "duration", "departure", "stops")
+
+def _price(option: Dict[str, Any]) -> float:
+    try:
+        return float(str(option.get("total_price", "")).replace("₹", "").replace(",", "").strip())
+    except ValueError:
+        return np.nan
+
+def _clock_minutes(value: Optional[str]) -> int:
+    """Minutes after midnight from "HH:MM", "YYYY-MM-DD HH:MM" or "hh:MM AM"."""
+    if not value:
+        return -1
+    try:
+        clock = value.strip().split(" ")
+        if clock[-1] in ("AM", "PM"):
+            hours, minutes = map(int, clock[-2].split(":"))
+            hours = hours % 12 + (12 if clock[-1] == "PM" else 0)
+        else:
+            hours, minutes = map(int, clock[-1].split(":"))
+        return hours * 60 + minutes
+    except (ValueError, IndexError):
+        return -1
+
+def _epoch_minutes(value: Optional[str]) -> float:
+    """Minutes since the epoch for a "YYYY-MM-DD HH:MM" time, NaN otherwise."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M").timestamp() / 60
+    except (TypeError, ValueError):
+        return np.nan
+
+class FlightResultSet:
+    """One leg of a search, with sortable fields held as compact arrays.
+
+    Options stay as the parsed dicts; only the rows of a requested page are
+    serialized.
+    """
+
+    def __init__(self, options: List[Dict[str, Any]]):
+        self.options = options
+        first_segments = [(o.get("segments") or [{}])[0] for o in options]
+        self.airlines = sorted({s.get("airline", "Unknown") for s in first_segments})
+        airline_index = {name: i for i, name in enumerate(self.airlines)}
+        self.price = np.array([_price(o) for o in options], dtype=np.float64)
+        self.duration = np.array([o.get("total_duration", 0) for o in options], dtype=np.int32)
+        self.stops = np.array([o.get("stops", 0) for o in options], dtype=np.int16)
+        self.departure = np.array([_clock_minutes(s.get("departure_time")) for s in first_segments], dtype=np.int16)
+        self.airline = np.array([airline_index[s.get("airline", "Unknown")] for s in first_segments], dtype=np.int16)
+        # Absolute times, used to check the stay between an outbound and a return
+        self.departs_at = np.array([_epoch_minutes(s.get("departure_time")) for s in first_segments])
+        self.arrives_at = np.array([_epoch_minutes((o.get("segments") or [{}])[-1].get("arrival_time"))
+                                    for o in options])
+
+    def query(self, sort: str = "price", descending: bool = False, max_stops: Optional[int] = None,
+              max_price: Optional[float] = None, depart_after: Optional[int] = None,
+              depart_before: Optional[int] = None, airline: Optional[str] = None) -> np.ndarray:
+        """Indices of matching options in sort order. Departure bounds are hours."""
+        mask = np.ones(len(self.options), dtype=bool)
+        if max_stops is not None:
+            mask &= self.stops <= max_stops
+        if max_price is not None:
+            mask &= self.price <= max_price
+        if depart_after is not None:
+            mask &= self.departure >= depart_after * 60
+        if depart_before is not None:
+            mask &= (self.departure >= 0) & (self.departure < depart_before * 60)
+        if airline is not None:
+            if airline not in self.airlines:
+                return np.empty(0, dtype=np.intp)
+            mask &= self.airline == self.airlines.index(airline)
+
+        matches = np.flatnonzero(mask)
+        column = {"price": self.price, "duration": self.duration,
+                  "departure": self.departure, "stops": self.stops}[sort]
+        values = column[matches].astype(np.float64)
+        if sort == "departure":
+            values[values < 0] = np.nan
+        # NaN (unknown price or time) sorts last either way
+        order = np.argsort(-values if descending else values, kind="stable")
+        return matches[order]
+
+class FlightResultStore:
+    """LRU of recent searches' result sets, keyed by search ID.
+
+    The ID is a hash of the normalized request, and the request itself goes to
+    the shared disk cache. A worker that never saw the search can rebuild it;
+    the rebuild is served by the SerpAPI caches rather than a new upstream call.
+    """
+
+    def __init__(self, max_searches: int = 500, ttl: float = 900):
+        self.max_searches = max_searches
+        self.ttl = ttl
+        self._sets: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def search_id(request: FlightRequest) -> str:
+        return hashlib.sha1(make_key("flights", request.model_dump()).encode("utf-8")).hexdigest()[:16]
+
+    def put(self, request: FlightRequest, flight_options: Dict[str, List[Dict[str, Any]]]) -> str:
+        search_id = self.search_id(request)
+        legs = {leg: FlightResultSet(options) for leg, options in flight_options.items()}
+        with self._lock:
+            self._sets[search_id] = (legs, time.monotonic() + self.ttl)
+            self._sets.move_to_end(search_id)
+            while len(self._sets) > self.max_searches:
+                self._sets.popitem(last=False)
+        return search_id
+
+    def _get(self, search_id: str) -> Optional[Dict[str, FlightResultSet]]:
+        with self._lock:
+            entry = self._sets.get(search_id)
+            if entry is None or entry[1] < time.monotonic():
+                self._sets.pop(search_id, None)
+                return None
+            self._sets.move_to_end(search_id)
+            return entry[0]
+
+    async def get(self, search_id: str) -> Dict[str, FlightResultSet]:
+        legs = self._get(search_id)
+        if legs is not None:
+            return legs
+        stored = await asyncio.to_thread(disk_cache.get, f"search:{search_id}") if disk_cache.enabled else None
+        if stored is None:
+            raise HTTPException(404, "Search not found or expired")
+        request = FlightRequest(**stored)
+        self.put(request, await search_flights_service(request))
+        return self._get(search_id)
+
+result_store = FlightResultStore(
+    max_searches=int(os.getenv("FLIGHT_RESULTS_MAX_SEARCHES", "500")),
+    ttl=cache_ttl("google_flights"),
+)
+
+async def index_search(request: FlightRequest, flight_options: Dict[str, List[Dict[str, Any]]]) -> str:
+    """Keep a search's results for later sorted/filtered paging and return its ID."""
+    search_id = result_store.put(request, flight_options)
+    if disk_cache.enabled:
+        await asyncio.to_thread(disk_cache.set, f"search:{search_id}", request.model_dump(), result_store.ttl)
+    return search_id
+
+async def search_with_id(request: FlightRequest) -> Dict[str, Any]:
+    """Run a flight search and index it; the results carry their ``search_id``."""
+    flight_options = await search_flights_service(request)
+    search_id = await index_search(request, flight_options)
+    return {"search_id": search_id, **flight_options}
+
+async def results_page_service(search_id: str, leg: str = "outbound", sort: str = "price",
+                               descending: bool = False, page: int = 1, page_size: int = 10,
+                               **filters) -> Dict[str, Any]:
+    if sort not in SORT_KEYS:
+        raise HTTPException(400, f"sort must be one of {', '.join(SORT_KEYS)}")
+    legs = await result_store.get(search_id)
+    if leg not in legs:
+        raise HTTPException(400, "leg must be outbound or return")
+    indices = legs[leg].query(sort=sort, descending=descending, **filters)
+    start = (page - 1) * page_size
+    return {
+        "search_id": search_id,
+        "leg": leg,
+        "total": int(len(indices)),
+        "page": page,
+        "page_size": page_size,
+        "pages": -(-len(indices) // page_size),
+        "results": [legs[leg].options[i] for i in indices[start:start + page_size]]
+    }
@@ -0,0 +1,157 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+from app.services import serpapi_client
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+class HotelPrefetcher:
+    """Warm hotel searches that a flight search suggests are coming next.
+
+    Searches wait in a bounded queue served by one background task. A
+    prefetch only goes upstream while no other SerpAPI call is in flight and
+    the rate limiter has ``reserve_tokens`` to spare, so it never delays a
+    user's request; one that can't run within ``max_wait`` seconds is
+    dropped. At most ``max_per_hour`` prefetches are spent per hour.
+
+    A foreground search claims a prefetched entry, which counts as a hit;
+    an entry whose TTL runs out unclaimed counts as wasted.
+    """
+
+    def __init__(self, enabled: bool = True, max_queue: int = 100, max_per_hour: int = 200,
+                 max_wait: float = 30, reserve_tokens: float = 5):
+        self.enabled = enabled
+        self.max_queue = max_queue
+        self.max_per_hour = max_per_hour
+        self.max_wait = max_wait
+        self.reserve_tokens = reserve_tokens
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._queued = set()
+        # Key -> expiry of prefetched results nobody has asked for yet
+        self._unclaimed: Dict[str, float] = {}
+        self._hour_started = time.monotonic()
+        self._hour_spent = 0
+        self.submitted = 0
+        self.deduplicated = 0
+        self.already_cached = 0
+        self.dropped = 0
+        self.fetched = 0
+        self.failed = 0
+        self.hits = 0
+        self.wasted = 0
+
+    def submit(self, params: Dict[str, Any]):
+        if not self.enabled:
+            return
+        self._sweep()
+        key = serpapi_client.cache_key(params)
+        if key in self._queued or key in self._unclaimed:
+            self.deduplicated += 1
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+        if self._queue.full():
+            self.dropped += 1
+            return
+        self.submitted += 1
+        self._queued.add(key)
+        self._queue.put_nowait((time.monotonic(), key, params))
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    def claim(self, params: Dict[str, Any]):
+        """Record that a user search asked for these params."""
+        expires_at = self._unclaimed.pop(serpapi_client.cache_key(params), None)
+        if expires_at is not None and expires_at > time.monotonic():
+            self.hits += 1
+        elif expires_at is not None:
+            self.wasted += 1
+
+    def _sweep(self):
+        now = time.monotonic()
+        for key in [k for k, expires_at in self._unclaimed.items() if expires_at <= now]:
+            del self._unclaimed[key]
+            self.wasted += 1
+
+    def _within_budget(self) -> bool:
+        now = time.monotonic()
+        if now - self._hour_started >= 3600:
+            self._hour_started, self._hour_spent = now, 0
+        return self._hour_spent < self.max_per_hour
+
+    async def _wait_for_idle(self, submitted_at: float) -> bool:
+        reserve = min(self.reserve_tokens, serpapi_client.rate_limiter.burst)
+        while time.monotonic() - submitted_at < self.max_wait:
+            if (serpapi_client.inflight.stats()["inflight"] == 0
+                    and serpapi_client.rate_limiter.available() >= reserve):
+                return True
+            await asyncio.sleep(0.1)
+        return False
+
+    async def _run(self):
+        while True:
+            submitted_at, key, params = await self._queue.get()
+            try:
+                await self._prefetch(submitted_at, key, params)
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"Hotel prefetch failed: {str(e)}")
+            finally:
+                self._queued.discard(key)
+
+    async def _prefetch(self, submitted_at: float, key: str, params: Dict[str, Any]):
+        if serpapi_client.is_cached(params):
+            self.already_cached += 1
+            return
+        if not self._within_budget() or not await self._wait_for_idle(submitted_at):
+            self.dropped += 1
+            return
+        # The user may have searched while this waited
+        if serpapi_client.is_cached(params):
+            self.already_cached += 1
+            return
+
+        self._hour_spent += 1
+        data = await serpapi_client.search(params)
+        if "error" in data:
+            self.failed += 1
+            return
+        self.fetched += 1
+        self._unclaimed[key] = time.monotonic() + serpapi_client.cache_ttl(params.get("engine", ""))
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+        self._queue = None
+        self._queued.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        self._sweep()
+        return {
+            "enabled": self.enabled,
+            "queued": len(self._queued),
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "already_cached": self.already_cached,
+            "dropped": self.dropped,
+            "fetched": self.fetched,
+            "failed": self.failed,
+            "hits": self.hits,
+            "wasted": self.wasted,
+            "pending_claim": len(self._unclaimed),
+            "hit_rate": round(self.hits / self.fetched, 4) if self.fetched else 0.0,
+        }
+
+hotel_prefetcher = HotelPrefetcher(
+    enabled=os.getenv("HOTEL_PREFETCH_ENABLED", "1") == "1",
+    max_queue=int(os.getenv("HOTEL_PREFETCH_MAX_QUEUE", "100")),
+    max_per_hour=int(os.getenv("HOTEL_PREFETCH_MAX_PER_HOUR", "200")),
+    max_wait=float(os.getenv("HOTEL_PREFETCH_MAX_WAIT", "30")),
+    reserve_tokens=float(os.getenv("HOTEL_PREFETCH_RESERVE_TOKENS", "5")),
+)
@@ -0,0 +1,131 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List
+import numpy as np
+from fastapi import HTTPException
+from app.cache import make_key
+from app.models import HotelRequest, HotelRankRequest
+from app.services.serpapi_client import cache_ttl
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+
+def _number(value: Any) -> float:
+    try:
+        return float(str(value).replace(",", "").strip())
+    except (TypeError, ValueError):
+        return np.nan
+
+def _scaled(values: np.ndarray, higher_is_better: bool = True) -> np.ndarray:
+    """Min-max scale to [0, 1] within the result set; unknown values score 0."""
+    known = ~np.isnan(values)
+    if not known.any():
+        return np.zeros_like(values)
+    low, high = values[known].min(), values[known].max()
+    scaled = np.ones_like(values) if high == low else (values - low) / (high - low)
+    if not higher_is_better:
+        scaled = 1.0 - scaled
+    return np.where(known, scaled, 0.0)
+
+class HotelResultSet:
+    """Cleaned hotels plus their rankable fields as float arrays.
+
+    Parsing the string fields happens once here; every ranking after that
+    is array arithmetic over the same columns.
+    """
+
+    def __init__(self, hotels: List[Dict[str, Any]]):
+        self.hotels = hotels
+        self.price = np.array([_number(h.get("price")) for h in hotels], dtype=np.float64)
+        self.rating = np.array([_number(h.get("rating")) for h in hotels], dtype=np.float64)
+        self.stars = np.array([h.get("stars") or np.nan for h in hotels], dtype=np.float64)
+        self.latitude = np.radians(np.array(
+            [np.nan if h.get("latitude") is None else h["latitude"] for h in hotels], dtype=np.float64))
+        self.longitude = np.radians(np.array(
+            [np.nan if h.get("longitude") is None else h["longitude"] for h in hotels], dtype=np.float64))
+
+    def distance_km(self, latitude: float, longitude: float) -> np.ndarray:
+        """Haversine distance from a point to every hotel; NaN where unknown."""
+        lat, lon = np.radians(latitude), np.radians(longitude)
+        a = (np.sin((self.latitude - lat) / 2) ** 2
+             + np.cos(lat) * np.cos(self.latitude) * np.sin((self.longitude - lon) / 2) ** 2)
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+    def rank(self, weights: HotelRankRequest):
+        """Indices of the top ``k`` hotels by weighted score, best first, with
+        their scores and distances (None when no point was given)."""
+        score = (weights.price_weight * _scaled(self.price, higher_is_better=False)
+                 + weights.rating_weight * _scaled(self.rating)
+                 + weights.stars_weight * _scaled(self.stars))
+        distance = None
+        if weights.latitude is not None and weights.longitude is not None:
+            distance = self.distance_km(weights.latitude, weights.longitude)
+            score = score + weights.distance_weight * _scaled(distance, higher_is_better=False)
+        total = weights.price_weight + weights.rating_weight + weights.stars_weight
+        if distance is not None:
+            total += weights.distance_weight
+        if total > 0:
+            score = score / total
+
+        k = min(weights.k, len(self.hotels))
+        if k == 0:
+            return np.empty(0, dtype=np.intp), score, distance
+        # Only the k winners get fully sorted
+        top = np.argpartition(-score, k - 1)[:k]
+        return top[np.argsort(-score[top], kind="stable")], score, distance
+
+class HotelResultStore:
+    """LRU of recent hotel searches' result sets, keyed by search ID."""
+
+    def __init__(self, max_searches: int = 500, ttl: float = 900):
+        self.max_searches = max_searches
+        self.ttl = ttl
+        self._sets: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def search_id(request: HotelRequest) -> str:
+        return hashlib.sha1(make_key("hotels", request.model_dump()).encode("utf-8")).hexdigest()[:16]
+
+    def put(self, request: HotelRequest, hotels: List[Dict[str, Any]]) -> str:
+        search_id = self.search_id(request)
+        with self._lock:
+            self._sets[search_id] = (HotelResultSet(hotels), time.monotonic() + self.ttl)
+            self._sets.move_to_end(search_id)
+            while len(self._sets) > self.max_searches:
+                self._sets.popitem(last=False)
+        return search_id
+
+    def get(self, search_id: str) -> HotelResultSet:
+        with self._lock:
+            entry = self._sets.get(search_id)
+            if entry is None or entry[1] < time.monotonic():
+                self._sets.pop(search_id, None)
+                raise HTTPException(404, "Search not found or expired")
+            self._sets.move_to_end(search_id)
+            return entry[0]
+
+result_store = HotelResultStore(
+    max_searches=int(os.getenv("HOTEL_RESULTS_MAX_SEARCHES", "500")),
+    ttl=cache_ttl("google_hotels"),
+)
+
+def rank_hotels_service(search_id: str, weights: HotelRankRequest) -> Dict[str, Any]:
+    """Re-rank a stored search; never goes back to SerpAPI."""
+    if weights.distance_weight > 0 and (weights.latitude is None or weights.longitude is None):
+        raise HTTPException(400, "distance_weight needs latitude and longitude")
+    result_set = result_store.get(search_id)
+    top, score, distance = result_set.rank(weights)
+    results = []
+    for i in top:
+        hotel = {**result_set.hotels[i], "score": round(float(score[i]), 4)}
+        if distance is not None:
+            hotel["distance_km"] = None if np.isnan(distance[i]) else round(float(distance[i]), 2)
+        results.append(hotel)
+    return {"search_id": search_id, "total": len(result_set.hotels), "results": results}
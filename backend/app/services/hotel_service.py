@@ -1,35 +1,101 @@
-import os
-import requests
+import asyncio
 import urllib.parse
 import logging
 from fastapi import HTTPException
-from typing import Dict
+from typing import Any, AsyncIterator, Dict
+from app import metrics, ndjson
 from app.utils import clean_hotel_data
+from app.models import HotelRequest
+from app.services import serpapi_client
+from app.services.hotel_prefetch import hotel_prefetcher
+from app.services.hotel_results import result_store
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
-def search_hotels_service(request):
+def _hotel_params(request) -> Dict[str, Any]:
+    params = {
+        "engine": "google_hotels",
+        "q": request.location,
+        "check_in_date": request.check_in_date,
+        "check_out_date": request.check_out_date,
+        "currency": "INR",
+        "hl": "en"
+    }
+
+    if request.stars:
+        params["stars"] = request.stars
+    return params
+
+def prefetch_hotels(flight_request):
+    """Queue the hotel search a user is likely to run after this flight search.
+
+    Mirrors the Streamlit hotel form's defaults: the destination as the city,
+    the trip dates, and 3 stars.
+    """
+    hotel_prefetcher.submit(_hotel_params(HotelRequest(
+        location=flight_request.destination,
+        check_in_date=flight_request.outbound_date,
+        check_out_date=flight_request.return_date,
+        stars=3
+    )))
+
+async def search_hotels_service(request):
     try:
-        params = {
-            "engine": "google_hotels",
-            "q": request.location,
-            "check_in_date": request.check_in_date,
-            "check_out_date": request.check_out_date,
-            "currency": "INR",
-            "api_key": os.getenv("SERPAPI_API_KEY"),
-            "hl": "en"
-        }
-        
-        if request.stars:
-            params["stars"] = request.stars
-
-        res = requests.get("https://serpapi.com/search", params=params)
-        data = res.json()
-
-        hotels = [clean_hotel_data(h, request.location) for h in data.get("properties", [])]
+        params = _hotel_params(request)
+        hotel_prefetcher.claim(params)
+        data = await serpapi_client.search(params)
+
+        with metrics.parse_seconds.labels("hotels").time():
+            hotels = [clean_hotel_data(h, request.location) for h in data.get("properties", [])]
         return {"hotels": hotels}
 
     except Exception as e:
         logger.error(f"Hotel search error: {str(e)}")
-        raise HTTPException(500, "Hotel search failed")
\ No newline at end of file
+        raise HTTPException(500, "Hotel search failed")
+
+def _next_page_token(data: Dict[str, Any]):
+    return (data.get("serpapi_pagination") or {}).get("next_page_token")
+
+async def stream_hotels_service(request, max_pages: int = 3) -> AsyncIterator[str]:
+    """Yield cleaned hotels as NDJSON, one ``page`` event per SerpAPI page.
+
+    Pages are followed through ``next_page_token`` up to ``max_pages``. The
+    next page is requested before the current one is cleaned and sent, so
+    its round trip overlaps with the client consuming this one.
+    """
+    params = _hotel_params(request)
+    hotel_prefetcher.claim(params)
+    pending = asyncio.create_task(serpapi_client.search(params))
+    page = 0
+    hotels = []
+    try:
+        while pending is not None:
+            try:
+                data = await pending
+            except Exception as e:
+                logger.error(f"Hotel search error on page {page + 1}: {str(e)}")
+                yield ndjson.event("error", "Hotel search failed")
+                return
+            if "error" in data:
+                if page == 0:
+                    yield ndjson.event("error", data["error"])
+                    return
+                break
+            page += 1
+
+            token = _next_page_token(data)
+            pending = None
+            if token and page < max_pages:
+                pending = asyncio.create_task(serpapi_client.search({**params, "next_page_token": token}))
+
+            with metrics.parse_seconds.labels("hotels").time():
+                cleaned = [clean_hotel_data(h, request.location) for h in data.get("properties", [])]
+            hotels.extend(cleaned)
+            yield ndjson.event("page", {"page": page, "hotels": cleaned, "has_more": pending is not None})
+        # All pages together can then be re-ranked without another search
+        search_id = result_store.put(request, hotels)
+        yield ndjson.event("done", {"pages": page, "total": len(hotels), "search_id": search_id})
+    finally:
+        if pending is not None:
+            pending.cancel()
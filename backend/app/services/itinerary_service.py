@@ -1,43 +1,89 @@
 import os
-import json
+import re
+import asyncio
 import logging
-from groq import Groq
+from typing import Any, Dict, List, Optional, Tuple
 from fastapi import HTTPException
+from app.cache import make_key
+from app.disk_cache import disk_cache
+from app.models import GeneratedItinerary
+from app.singleflight import SingleFlight
+from app.services.model_dispatcher import model_dispatcher
+from app.services.semantic_cache import semantic_cache
 from app.utils import calculate_time_slots
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
-def generate_itinerary_service(request):
+# Tried in this order until the registry has observed how each one performs
+PREFERRED_MODELS = [
+    "mixtral-8x7b-32768",
+    "llama3-70b-8192",
+    "llama3-8b-8192",
+    "gemma-7b-it"
+]
+
+# Identical itinerary requests in flight at the same time share one Groq call
+inflight = SingleFlight("groq")
+
+def cache_key(request) -> str:
+    return make_key("itinerary", request.model_dump())
+
+def cache_ttl() -> float:
+    return float(os.getenv("ITINERARY_CACHE_TTL", "86400"))
+
+async def generate_itinerary_service(request):
+    key = cache_key(request)
+    return await inflight.do(key, lambda: _cached_itinerary(key, request))
+
+def semantic_lookup(request):
     try:
-        groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-        
-        # Get available models
-        available_models = [model.id for model in groq_client.models.list().data]
-        logger.info(f"Available Groq models: {available_models}")
-        
-        # Calculate time slots based on arrival
-        time_slots = calculate_time_slots(request.arrival_time) if request.arrival_time else {
-            "morning": "9:00 AM - 12:00 PM",
-            "afternoon": "1:00 PM - 5:00 PM",
-            "evening": "6:00 PM - 10:00 PM"
-        }
+        return semantic_cache.lookup(request)
+    except Exception as e:
+        logger.warning(f"Semantic cache lookup failed: {str(e)}")
+        return None
 
-        prompt = f"""Create a detailed {request.duration}-day travel itinerary for {request.destination}.
-        Travel style: {request.travel_style}
-        Budget: {request.budget}
-        Interests: {', '.join(request.interests)}
-        Flight arrives at: {request.arrival_time or 'morning'}
+def semantic_store(request, itinerary):
+    try:
+        semantic_cache.store(request, itinerary)
+    except Exception as e:
+        logger.warning(f"Semantic cache store failed: {str(e)}")
 
-        For Day 1, use these time slots:
-        Morning: {time_slots['morning']} (after arrival activities)
-        Afternoon: {time_slots['afternoon']} (main activities)
-        Evening: {time_slots['evening']} (dinner/relaxation)
+async def _cached_itinerary(key, request):
+    if disk_cache.enabled:
+        cached = await asyncio.to_thread(disk_cache.get, key)
+        if cached is not None:
+            return cached
+    # A near-duplicate request can reuse an earlier itinerary
+    itinerary = await asyncio.to_thread(semantic_lookup, request)
+    if itinerary is None:
+        if use_chunked(request):
+            itinerary = await generate_chunked_itinerary(request)
+        else:
+            itinerary = await _generate_itinerary(request)
+        await asyncio.to_thread(semantic_store, request, itinerary)
+    if disk_cache.enabled:
+        await asyncio.to_thread(disk_cache.set, key, itinerary, cache_ttl())
+    return itinerary
 
-        Return JSON with these exact fields:
-        {{
-            "summary": "brief overview",
-            "daily_plans": [
+def _default_time_slots():
+    return {
+        "morning": "9:00 AM - 12:00 PM",
+        "afternoon": "1:00 PM - 5:00 PM",
+        "evening": "6:00 PM - 10:00 PM"
+    }
+
+def build_prompt(request, days_first: bool = False) -> str:
+    """Build the itinerary prompt.
+
+    With ``days_first`` the schema lists ``daily_plans`` before the summary,
+    so a streamed completion yields usable days as early as possible.
+    """
+    # Calculate time slots based on arrival
+    time_slots = calculate_time_slots(request.arrival_time) if request.arrival_time else _default_time_slots()
+
+    summary_field = '"summary": "brief overview",'
+    daily_plans_field = f'''"daily_plans": [
                 {{
                     "day": 1,
                     "date": "Day 1",
@@ -57,45 +103,213 @@ def generate_itinerary_service(request):
                     }},
                     "highlights": ["key attractions"]
                 }}
-            ],
+            ],'''
+    fields = [daily_plans_field, summary_field] if days_first else [summary_field, daily_plans_field]
+
+    return f"""Create a detailed {request.duration}-day travel itinerary for {request.destination}.
+        Travel style: {request.travel_style}
+        Budget: {request.budget}
+        Interests: {', '.join(request.interests)}
+        Flight arrives at: {request.arrival_time or 'morning'}
+
+        For Day 1, use these time slots:
+        Morning: {time_slots['morning']} (after arrival activities)
+        Afternoon: {time_slots['afternoon']} (main activities)
+        Evening: {time_slots['evening']} (dinner/relaxation)
+
+        Return JSON with these exact fields{" in this order, and nothing but the JSON object" if days_first else ""}:
+        {{
+            {fields[0]}
+            {fields[1]}
             "packing_list": ["essential items"],
             "local_tips": ["useful advice"]
         }}"""
-        
-        # Try preferred models in order
-        preferred_models = [
-            "mixtral-8x7b-32768",
-            "llama3-70b-8192",
-            "llama3-8b-8192",
-            "gemma-7b-it"
-        ]
-        
-        last_error = None
-        
-        for model in preferred_models:
-            if model not in available_models:
-                continue
-                
-            try:
-                response = groq_client.chat.completions.create(
-                    messages=[{"role": "user", "content": prompt}],
-                    model=model,
-                    response_format={"type": "json_object"},
-                    temperature=0.7
-                )
-                
-                if response.choices and response.choices[0].message.content:
-                    itinerary = json.loads(response.choices[0].message.content)
-                    itinerary["destination"] = request.destination
-                    return itinerary
-                    
-            except Exception as e:
-                last_error = e
-                logger.warning(f"Model {model} failed: {str(e)}")
-                continue
-        
-        raise Exception(f"No working model found. Last error: {str(last_error)}")
+
+async def complete_json(prompt: str) -> dict:
+    return await model_dispatcher.complete_json(prompt, PREFERRED_MODELS)
+
+async def _generate_itinerary(request):
+    try:
+        itinerary = await complete_json(build_prompt(request))
+        itinerary["destination"] = request.destination
+        # Validate before the caller caches it, so a malformed reply is retried
+        return GeneratedItinerary.model_validate(itinerary).model_dump()
 
     except Exception as e:
         logger.error(f"Itinerary generation error: {str(e)}")
-        raise HTTPException(500, f"Itinerary generation failed: {str(e)}")
\ No newline at end of file
+        raise HTTPException(500, f"Itinerary generation failed: {str(e)}")
+
+def use_chunked(request) -> bool:
+    """Chunking costs 1 + ceil(days / CHUNK_DAYS) Groq calls instead of one, so
+    it is opt-in: per request, or for long trips once ``CHUNKED_MIN_DAYS`` is set."""
+    if request.chunked is not None:
+        return request.chunked
+    min_days = int(os.getenv("CHUNKED_MIN_DAYS", "0"))
+    return 0 < min_days <= request.duration
+
+def day_ranges(request) -> List[Tuple[int, int]]:
+    """Inclusive ``(first, last)`` day ranges of ``CHUNK_DAYS`` days each."""
+    chunk_days = max(1, int(os.getenv("CHUNK_DAYS", "3")))
+    return [
+        (first, min(first + chunk_days - 1, request.duration))
+        for first in range(1, request.duration + 1, chunk_days)
+    ]
+
+def _outline_prompt(request) -> str:
+    return f"""Outline a {request.duration}-day travel itinerary for {request.destination}.
+        Travel style: {request.travel_style}
+        Budget: {request.budget}
+        Interests: {', '.join(request.interests)}
+
+        Give every day a theme and 2-4 distinct attractions; never repeat an
+        attraction on two days. Return JSON with these exact fields:
+        {{
+            "summary": "brief overview",
+            "days": [
+                {{"day": 1, "theme": "theme of the day", "attractions": ["attraction"]}}
+            ],
+            "packing_list": ["essential items"],
+            "local_tips": ["useful advice"]
+        }}"""
+
+def _day_number(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _name(text: str) -> str:
+    """Lowercased words only, so "Fort Kochi!" and "fort  kochi" compare equal."""
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+def _strings(value) -> List[str]:
+    return [v for v in value if isinstance(v, str)] if isinstance(value, list) else []
+
+def outline_days(outline) -> List[Dict[str, Any]]:
+    """The outline's days with a usable day number; other entries are dropped.
+
+    The outline comes straight from the model, so day numbers may arrive as
+    strings and themes or attractions may be missing or the wrong type.
+    """
+    days = outline.get("days") if isinstance(outline, dict) else None
+    cleaned = []
+    for entry in days if isinstance(days, list) else []:
+        day = _day_number(entry.get("day")) if isinstance(entry, dict) else None
+        if day is not None:
+            theme = entry.get("theme")
+            cleaned.append({
+                "day": day,
+                "theme": theme if isinstance(theme, str) else "",
+                "attractions": _strings(entry.get("attractions")),
+            })
+    return cleaned
+
+def _chunk_prompt(request, outline_days, first: int, last: int) -> str:
+    """``outline_days`` must have been cleaned by ``outline_days``."""
+    time_slots = calculate_time_slots(request.arrival_time) if request.arrival_time else _default_time_slots()
+    planned = "\n".join(
+        f"        Day {d['day']}: {d['theme']} - {', '.join(d['attractions'])}"
+        for d in outline_days if first <= d["day"] <= last
+    )
+    elsewhere = sorted({
+        a for d in outline_days if not first <= d["day"] <= last
+        for a in d["attractions"]
+    })
+    day_one = f"""
+        Day 1 starts after the flight arrives at {request.arrival_time or 'morning'}; use these time slots:
+        Morning: {time_slots['morning']}, Afternoon: {time_slots['afternoon']}, Evening: {time_slots['evening']}
+""" if first == 1 else ""
+
+    return f"""Write days {first} to {last} of a {request.duration}-day travel itinerary for {request.destination}.
+        Travel style: {request.travel_style}
+        Budget: {request.budget}
+        Interests: {', '.join(request.interests)}
+
+        Follow this plan:
+{planned}
+        Do not include these attractions, they are covered on other days: {', '.join(elsewhere) or 'none'}
+{day_one}
+        Return JSON with these exact fields, one entry per day from {first} to {last}:
+        {{
+            "daily_plans": [
+                {{
+                    "day": {first},
+                    "date": "Day {first}",
+                    "time_slots": {{
+                        "morning": {{"time": "{time_slots['morning'] if first == 1 else '9:00 AM - 12:00 PM'}", "activities": ["activity"]}},
+                        "afternoon": {{"time": "1:00 PM - 5:00 PM", "activities": ["main activity"]}},
+                        "evening": {{"time": "6:00 PM - 10:00 PM", "activities": ["dinner","relax"]}}
+                    }},
+                    "highlights": ["key attractions"]
+                }}
+            ]
+        }}"""
+
+def merge_chunks(request, outline, chunks) -> dict:
+    """Combine per-range daily plans into one itinerary.
+
+    Plans are ordered by day with one plan kept per day. A highlight already
+    used on an earlier day is dropped, as is an activity that names one, so
+    concurrently generated chunks don't repeat each other. Names are compared
+    whole, so a highlight "Fort" does not remove "Dinner near Fort Kochi". Entries that
+    are not objects, and values of the wrong type, are skipped rather than
+    failing the whole itinerary.
+    """
+    by_day = {}
+    for chunk in chunks:
+        plans = chunk.get("daily_plans") if isinstance(chunk, dict) else None
+        for plan in plans if isinstance(plans, list) else []:
+            day = _day_number(plan.get("day")) if isinstance(plan, dict) else None
+            if day is not None and 1 <= day <= request.duration:
+                by_day.setdefault(day, dict(plan, day=day))
+
+    seen = set()
+    daily_plans = []
+    for day in sorted(by_day):
+        plan = by_day[day]
+        highlights = []
+        for highlight in _strings(plan.get("highlights")):
+            name = _name(highlight)
+            if name not in seen:
+                seen.add(name)
+                highlights.append(highlight)
+        earlier = seen - {_name(h) for h in highlights}
+        slots = plan.get("time_slots")
+        time_slots = {
+            slot_name: dict(slot, activities=[
+                a for a in _strings(slot.get("activities"))
+                if _name(a) not in earlier
+            ])
+            for slot_name, slot in (slots.items() if isinstance(slots, dict) else [])
+            if isinstance(slot, dict)
+        }
+        daily_plans.append(dict(plan, highlights=highlights, time_slots=time_slots))
+
+    summary = outline.get("summary")
+    return {
+        "summary": summary if isinstance(summary, str) else "",
+        "daily_plans": daily_plans,
+        "packing_list": _strings(outline.get("packing_list")),
+        "local_tips": _strings(outline.get("local_tips")),
+        "destination": request.destination
+    }
+
+async def generate_chunked_itinerary(request) -> dict:
+    """Generate a long itinerary as a short outline plus concurrent day ranges.
+
+    Latency tracks the outline plus the slowest chunk instead of growing
+    with the trip length, and each call stays well inside small context
+    windows.
+    """
+    try:
+        outline = await complete_json(_outline_prompt(request))
+        days = outline_days(outline)
+        chunks = await asyncio.gather(*[
+            complete_json(_chunk_prompt(request, days, first, last))
+            for first, last in day_ranges(request)
+        ])
+        return GeneratedItinerary.model_validate(merge_chunks(request, outline, chunks)).model_dump()
+
+    except Exception as e:
+        logger.error(f"Chunked itinerary generation error: {str(e)}")
+        raise HTTPException(500, f"Itinerary generation failed: {str(e)}")
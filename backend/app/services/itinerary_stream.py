@@ -0,0 +1,238 @@
+import json
+import time
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from app import metrics, ndjson
+from app.disk_cache import disk_cache
+from app.models import DailyPlan, GeneratedItinerary
+from app.services.model_registry import model_registry
+from app.services.model_dispatcher import model_dispatcher
+from app.services.itinerary_service import (
+    PREFERRED_MODELS, _chunk_prompt, _outline_prompt, build_prompt, cache_key, cache_ttl,
+    complete_json, day_ranges, merge_chunks, outline_days, semantic_lookup, semantic_store
+)
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+class DailyPlanScanner:
+    """Pull complete ``daily_plans`` entries out of a partial JSON document.
+
+    Text is fed in as it streams from the model. The scanner tracks string
+    and nesting state, and every time an object inside the top-level
+    ``daily_plans`` array closes it is decoded and returned.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = None
+        self._last_top_level_string = None
+        self._in_daily_plans = False
+        self._plan_start = None
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        self.text += chunk
+        plans = []
+        text = self.text
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_top_level_string = text[self._string_start + 1:i]
+            elif ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in "{[":
+                self._depth += 1
+                if ch == "[" and self._depth == 2 and self._last_top_level_string == "daily_plans":
+                    self._in_daily_plans = True
+                elif ch == "{" and self._in_daily_plans and self._depth == 3:
+                    self._plan_start = i
+            elif ch in "}]":
+                if ch == "}" and self._in_daily_plans and self._depth == 3 and self._plan_start is not None:
+                    try:
+                        plans.append(json.loads(text[self._plan_start:i + 1]))
+                    except json.JSONDecodeError as e:
+                        logger.warning(f"Skipping malformed daily plan: {str(e)}")
+                    self._plan_start = None
+                elif ch == "]" and self._depth == 2:
+                    self._in_daily_plans = False
+                self._depth -= 1
+        self._pos = len(text)
+        return plans
+
+def _tail_events(itinerary: Dict[str, Any]) -> Iterator[str]:
+    yield ndjson.event("summary", itinerary["summary"])
+    yield ndjson.event("packing_list", itinerary["packing_list"])
+    yield ndjson.event("local_tips", itinerary["local_tips"])
+    yield ndjson.event("done")
+
+def _extract_json(text: str) -> Dict[str, Any]:
+    # Without JSON mode the model may wrap the object in prose or fences
+    start, end = text.find("{"), text.rfind("}")
+    return json.loads(text[start:end + 1])
+
+def _cached(key, request) -> Optional[Dict[str, Any]]:
+    cached = disk_cache.get(key) if disk_cache.enabled else None
+    if cached is None:
+        cached = semantic_lookup(request)
+    return cached
+
+def _store(key, request, itinerary):
+    semantic_store(request, itinerary)
+    if disk_cache.enabled:
+        disk_cache.set(key, itinerary, cache_ttl())
+
+def stream_itinerary_service(request) -> Iterator[str]:
+    """Yield NDJSON events: one ``day`` per DailyPlan as soon as it is complete,
+    then ``summary``, ``packing_list``, ``local_tips`` and ``done``.
+
+    Failures are reported as an ``error`` event since the response status has
+    already been sent.
+    """
+    key = cache_key(request)
+    cached = _cached(key, request)
+    if cached is not None:
+        for plan in cached["daily_plans"]:
+            yield ndjson.event("day", plan)
+        yield from _tail_events(cached)
+        return
+
+    prompt = build_prompt(request, days_first=True)
+    models = model_registry.ranked(PREFERRED_MODELS)
+    last_error = None if models else f"none of the preferred models {PREFERRED_MODELS} is in Groq's model list"
+
+    for model in models:
+        breaker = model_dispatcher.breaker(model)
+        if not breaker.allow():
+            continue
+        started = time.perf_counter()
+        scanner = DailyPlanScanner()
+        emitted = 0
+        stream = None
+        settled = False
+        try:
+            # Groq's JSON mode does not stream, so the prompt asks for bare JSON
+            stream = model_registry.client.chat.completions.create(
+                messages=[{"role": "user", "content": prompt}],
+                model=model,
+                temperature=0.7,
+                stream=True
+            )
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                for plan in scanner.feed(delta):
+                    yield ndjson.event("day", DailyPlan(**plan).model_dump())
+                    emitted += 1
+
+            itinerary = _extract_json(scanner.text)
+            itinerary["destination"] = request.destination
+            with metrics.parse_seconds.labels("itinerary_validation").time():
+                itinerary = GeneratedItinerary(**itinerary).model_dump()
+            model_registry.record(model, True, (time.perf_counter() - started) * 1000)
+            breaker.on_success()
+            settled = True
+
+            # Days that only became parseable with the full document
+            for plan in itinerary["daily_plans"][emitted:]:
+                yield ndjson.event("day", plan)
+            yield from _tail_events(itinerary)
+
+            _store(key, request, itinerary)
+            return
+
+        except Exception as e:
+            last_error = e
+            model_registry.record(model, False, (time.perf_counter() - started) * 1000, str(e))
+            breaker.on_failure()
+            settled = True
+            logger.warning(f"Model {model} failed while streaming: {str(e)}")
+            # Days already sent can't be taken back, so only retry a clean slate
+            if emitted:
+                break
+
+        finally:
+            # A client disconnect raises GeneratorExit at a yield, which
+            # skips both outcomes; give back a half-open probe if we held it
+            if not settled:
+                breaker.release()
+            if stream is not None:
+                stream.close()
+
+    if last_error is None:
+        # Every model was skipped without being tried
+        last_error = "every circuit breaker is open"
+    logger.error(f"Itinerary streaming error: {str(last_error)}")
+    yield ndjson.event("error", f"Itinerary generation failed: {str(last_error)}")
+
+async def stream_chunked_itinerary(request) -> AsyncIterator[str]:
+    """The events of ``stream_itinerary_service`` for a chunked itinerary.
+
+    After the outline, every range of days is requested at once. Days are
+    sent in order: when a chunk lands, its days go out as soon as every
+    earlier range has landed too, so the first days arrive with the first
+    chunk rather than after the slowest one.
+    """
+    key = cache_key(request)
+    cached = await asyncio.to_thread(_cached, key, request)
+    if cached is not None:
+        for plan in cached["daily_plans"]:
+            yield ndjson.event("day", plan)
+        for event in _tail_events(cached):
+            yield event
+        return
+
+    pending = []
+    try:
+        outline = await complete_json(_outline_prompt(request))
+        days = outline_days(outline)
+        ranges = day_ranges(request)
+        pending = [
+            asyncio.create_task(complete_json(_chunk_prompt(request, days, first, last)))
+            for first, last in ranges
+        ]
+        chunks = []
+        emitted = 0
+        for task in pending:
+            chunks.append(await task)
+            # Merging the landed prefix keeps highlights de-duplicated in day order
+            merged = merge_chunks(request, outline, chunks)["daily_plans"]
+            last_day = ranges[len(chunks) - 1][1]
+            for plan in merged[emitted:]:
+                if plan["day"] > last_day:
+                    break
+                yield ndjson.event("day", DailyPlan(**plan).model_dump())
+                emitted += 1
+
+        with metrics.parse_seconds.labels("itinerary_validation").time():
+            itinerary = GeneratedItinerary.model_validate(merge_chunks(request, outline, chunks)).model_dump()
+    except Exception as e:
+        logger.error(f"Chunked itinerary streaming error: {str(e)}")
+        yield ndjson.event("error", f"Itinerary generation failed: {str(e)}")
+        return
+    finally:
+        # Ranges still running when the client disconnects are not needed
+        for task in pending:
+            task.cancel()
+            if task.done() and not task.cancelled():
+                # Retrieve failures of ranges never awaited so they aren't logged
+                task.exception()
+
+    for plan in itinerary["daily_plans"][emitted:]:
+        yield ndjson.event("day", plan)
+    for event in _tail_events(itinerary):
+        yield event
+    await asyncio.to_thread(_store, key, request, itinerary)
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+from typing import Dict, Tuple
+from anyio import to_thread
+from app import metrics
+from app.disk_cache import disk_cache
+from app.outbox import outbox
+from app.services import serpapi_client
+from app.services.email_renderer import render_cache
+from app.services.email_sender import email_sender
+from app.services.semantic_cache import semantic_cache
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Outbox counts come from a SQLite query, so they are read off the event loop
+# before each scrape and rendered from here
+_outbox_counts: Dict[str, int] = {}
+
+def _cache_lookups() -> Dict[str, Tuple[int, int]]:
+    """Hits and misses per cache, from the counters the caches already keep."""
+    search = serpapi_client.response_cache.stats()
+    disk = disk_cache.stats()
+    semantic = semantic_cache.stats()
+    render = render_cache.stats()
+    return {
+        # Stale entries are served straight away, so they count as hits
+        "search": (search["hits"] + search["stale_hits"], search["misses"]),
+        "disk": (disk["hits"], disk["misses"]),
+        "semantic": (semantic["hits"], semantic["lookups"] - semantic["hits"]),
+        "email_render": (render["hits"], render["misses"]),
+    }
+
+def _cache_metric(name: str, documentation: str, kind: str, value) -> metrics.ScrapeMetric:
+    return metrics.ScrapeMetric(
+        name, documentation, kind, ("cache",),
+        lambda: {(cache,): value(hits, misses) for cache, (hits, misses) in _cache_lookups().items()},
+    )
+
+def _threadpool_metric(name: str, documentation: str, value) -> metrics.ScrapeMetric:
+    # The limiter is per event loop, so this must be scraped on the loop
+    return metrics.ScrapeMetric(
+        name, documentation, "gauge", (),
+        lambda: {(): value(to_thread.current_default_thread_limiter())},
+    )
+
+for metric in (
+    _cache_metric("cache_hits_total", "Cache lookups answered from the cache", "counter",
+                  lambda hits, misses: hits),
+    _cache_metric("cache_misses_total", "Cache lookups that missed", "counter",
+                  lambda hits, misses: misses),
+    _cache_metric("cache_hit_ratio", "Share of cache lookups that hit since start-up", "gauge",
+                  lambda hits, misses: hits / (hits + misses) if hits + misses else 0.0),
+    # Sync endpoints, run_in_threadpool and sync streaming bodies share these threads
+    _threadpool_metric("threadpool_threads_limit", "Worker threads available to sync handlers",
+                       lambda limiter: limiter.total_tokens),
+    _threadpool_metric("threadpool_threads_in_use", "Worker threads running sync handlers",
+                       lambda limiter: limiter.borrowed_tokens),
+    _threadpool_metric("threadpool_tasks_waiting", "Sync handlers queued for a free thread",
+                       lambda limiter: limiter.statistics().tasks_waiting),
+    metrics.ScrapeMetric(
+        "email_outbox_messages", "Emails in the outbox by status", "gauge", ("status",),
+        lambda: {(status,): count for status, count in _outbox_counts.items()},
+    ),
+    metrics.ScrapeMetric(
+        "email_sends_in_flight", "SendGrid calls in progress", "gauge", (),
+        lambda: {(): email_sender.in_flight},
+    ),
+):
+    metrics.registry.register(metric)
+
+async def metrics_service() -> str:
+    """Every metric in the Prometheus text format."""
+    global _outbox_counts
+    try:
+        _outbox_counts = await asyncio.to_thread(outbox.stats)
+    except Exception as e:
+        # Keep the last counts rather than failing the whole scrape
+        logger.warning(f"Outbox stats unavailable for metrics: {str(e)}")
+    # Rendered on the event loop, where the threadpool gauges must be read
+    return metrics.registry.render()
@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+from fastapi.concurrency import run_in_threadpool
+from app import metrics
+from app.services.model_registry import ModelRegistry, model_registry
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+class CircuitBreaker:
+    """Per-model breaker: closed, open after repeated failures, half-open probe.
+
+    While open, the model gets no traffic. After ``cooldown`` seconds a single
+    probe request is let through; its success closes the breaker, its failure
+    opens it again. A probe that reports neither within ``probe_timeout``
+    seconds is treated as lost and another one is allowed.
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 30, probe_timeout: float = 120):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.probe_timeout = probe_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            now = time.monotonic()
+            if self.state == "open" and now - self.opened_at >= self.cooldown:
+                self.state = "half_open"
+            if self.state == "half_open" and (not self._probing or now - self._probe_started >= self.probe_timeout):
+                self._probing = True
+                self._probe_started = now
+                return True
+            return False
+
+    def release(self):
+        """Give back a probe whose call ended without an outcome."""
+        with self._lock:
+            self._probing = False
+
+    def on_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def on_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+class ModelDispatcher:
+    """Send a JSON completion to the ranked models with hedging.
+
+    The best-ranked model whose breaker allows traffic is called first. If it
+    hasn't answered within its observed p95 latency (or ``default_hedge_ms``
+    before enough samples exist), the next model is called as well, up to
+    ``max_in_flight`` at once. A failure launches the next model straight
+    away. The first valid JSON reply wins; slower calls finish in the
+    background and still feed the registry and breakers.
+    """
+
+    def __init__(self, registry: ModelRegistry, default_hedge_ms: float = 8000,
+                 max_in_flight: int = 2, failure_threshold: int = 3, cooldown: float = 30,
+                 probe_timeout: float = 120):
+        self.registry = registry
+        self.default_hedge_ms = default_hedge_ms
+        self.max_in_flight = max_in_flight
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.probe_timeout = probe_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.hedges = 0
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        breaker = self._breakers.get(model)
+        if breaker is None:
+            # setdefault keeps one breaker per model when threads race here
+            breaker = self._breakers.setdefault(model, CircuitBreaker(
+                self.failure_threshold, self.cooldown, self.probe_timeout))
+        return breaker
+
+    def hedge_delay(self, model: str) -> float:
+        p95 = self.registry.latency_percentile(model)
+        return (p95 if p95 is not None else self.default_hedge_ms) / 1000
+
+    def _call(self, model: str, prompt: str, temperature: float) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            response = self.registry.client.chat.completions.create(
+                messages=[{"role": "user", "content": prompt}],
+                model=model,
+                response_format={"type": "json_object"},
+                temperature=temperature
+            )
+            if not (response.choices and response.choices[0].message.content):
+                raise ValueError("Empty completion")
+            with metrics.parse_seconds.labels("groq_json").time():
+                result = json.loads(response.choices[0].message.content)
+        except Exception as e:
+            self.registry.record(model, False, (time.perf_counter() - started) * 1000, str(e))
+            self.breaker(model).on_failure()
+            raise
+        self.registry.record(model, True, (time.perf_counter() - started) * 1000)
+        self.breaker(model).on_success()
+        return result
+
+    async def complete_json(self, prompt: str, preferred: List[str], temperature: float = 0.7) -> Dict[str, Any]:
+        ranked = self.registry.ranked(preferred)
+        if not ranked:
+            raise Exception(f"No working model found: none of the preferred models {preferred} "
+                            f"is in Groq's model list")
+        candidates = iter(ranked)
+        pending: Dict[asyncio.Task, str] = {}
+        last_error: Optional[Exception] = None
+
+        def launch() -> bool:
+            for model in candidates:
+                if self.breaker(model).allow():
+                    task = asyncio.ensure_future(run_in_threadpool(self._call, model, prompt, temperature))
+                    # Losing hedges may fail after we've returned; mark their errors as seen
+                    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+                    pending[task] = model
+                    return True
+            return False
+
+        if not launch():
+            raise Exception("No working model found: every circuit breaker is open")
+        latest = next(iter(pending.values()))
+        while pending:
+            can_hedge = len(pending) < self.max_in_flight
+            done, _ = await asyncio.wait(
+                pending,
+                timeout=self.hedge_delay(latest) if can_hedge else None,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                if launch():
+                    self.hedges += 1
+                    latest = list(pending.values())[-1]
+                    logger.info(f"Hedging slow model with {latest}")
+                else:
+                    # Nothing left to hedge with; just wait for what's running
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # Prefer a success over launching a replacement for a failure
+            for task in sorted(done, key=lambda t: t.exception() is not None):
+                model = pending.pop(task)
+                try:
+                    return task.result()
+                except Exception as e:
+                    last_error = e
+                    logger.warning(f"Model {model} failed: {str(e)}")
+                    if launch():
+                        latest = list(pending.values())[-1]
+
+        raise Exception(f"No working model found. Last error: {str(last_error)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hedges": self.hedges,
+            "breakers": {
+                model: {"state": b.state, "failures": b.failures}
+                for model, b in self._breakers.items()
+            },
+        }
+
+model_dispatcher = ModelDispatcher(
+    model_registry,
+    default_hedge_ms=float(os.getenv("GROQ_HEDGE_DEFAULT_MS", "8000")),
+    max_in_flight=int(os.getenv("GROQ_HEDGE_MAX_IN_FLIGHT", "2")),
+    failure_threshold=int(os.getenv("GROQ_BREAKER_FAILURES", "3")),
+    cooldown=float(os.getenv("GROQ_BREAKER_COOLDOWN", "30")),
+    probe_timeout=float(os.getenv("GROQ_BREAKER_PROBE_TIMEOUT", "120")),
+)
@@ -0,0 +1,158 @@
+import os
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from app import metrics
+
+if TYPE_CHECKING:
+    from groq import Groq
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ModelStats:
+    successes: int = 0
+    failures: int = 0
+    latency_ms: Optional[float] = None
+    last_error: Optional[str] = None
+    recent_ms: deque = field(default_factory=lambda: deque(maxlen=100))
+
+    @property
+    def success_rate(self) -> float:
+        # Laplace smoothing keeps one early failure from benching a model
+        return (self.successes + 1) / (self.successes + self.failures + 2)
+
+class ModelRegistry:
+    """Long-lived Groq client plus the set of models it can serve.
+
+    The model list is fetched in the background from startup on, so neither
+    start-up nor request handlers wait for a ``models.list()`` round trip.
+    The ``groq`` SDK is imported when the client is first needed, which
+    keeps it out of worker start-up. Per-model outcomes are recorded to
+    order candidates by observed success and speed.
+    """
+
+    def __init__(self, refresh_interval: float = 600, latency_alpha: float = 0.2):
+        self.refresh_interval = refresh_interval
+        self.latency_alpha = latency_alpha
+        self._client: Optional["Groq"] = None
+        self.available: List[str] = []
+        self.refreshed_at: Optional[float] = None
+        self._stats: Dict[str, ModelStats] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def configure(self, client: Optional["Groq"]):
+        """Use ``client`` instead of building one from ``GROQ_API_KEY``.
+
+        Tests pass a fake client here; ``None`` goes back to building the
+        real one on first use.
+        """
+        self._client = client
+
+    @property
+    def client(self) -> "Groq":
+        if self._client is None:
+            from groq import Groq
+            self._client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+        return self._client
+
+    def refresh(self):
+        models = [model.id for model in self.client.models.list().data]
+        self.available = models
+        self.refreshed_at = time.time()
+        logger.info(f"Available Groq models: {models}")
+
+    async def _refresh_loop(self):
+        # Until the first refresh lands, ranked() keeps every preferred model
+        try:
+            await asyncio.to_thread(self.refresh)
+        except Exception as e:
+            logger.warning(f"Initial Groq model refresh failed: {str(e)}")
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                logger.warning(f"Groq model refresh failed: {str(e)}")
+
+    async def start(self):
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def record(self, model: str, ok: bool, latency_ms: float, error: Optional[str] = None):
+        metrics.observe_upstream("groq", model, "ok" if ok else "error", latency_ms / 1000)
+        with self._lock:
+            stats = self._stats.setdefault(model, ModelStats())
+            # Slow failures count towards latency too: they cost the caller
+            # the same wall time before the next model can be tried
+            if stats.latency_ms is None:
+                stats.latency_ms = latency_ms
+            else:
+                stats.latency_ms += self.latency_alpha * (latency_ms - stats.latency_ms)
+            if ok:
+                stats.successes += 1
+                stats.recent_ms.append(latency_ms)
+            else:
+                stats.failures += 1
+                stats.last_error = error
+
+    def latency_percentile(self, model: str, pct: float = 0.95, min_samples: int = 5) -> Optional[float]:
+        """Percentile of recent successful call latencies, once enough are seen."""
+        with self._lock:
+            stats = self._stats.get(model)
+            if stats is None or len(stats.recent_ms) < min_samples:
+                return None
+            samples = sorted(stats.recent_ms)
+        return samples[min(len(samples) - 1, int(len(samples) * pct))]
+
+    def ranked(self, preferred: List[str]) -> List[str]:
+        """Order ``preferred`` by expected time to a successful response.
+
+        Models missing from the last refresh are dropped; if no refresh has
+        succeeded yet, every preferred model stays a candidate.
+        """
+        candidates = [m for m in preferred if not self.available or m in self.available]
+        with self._lock:
+            observed = [s.latency_ms for s in self._stats.values() if s.latency_ms is not None]
+            default_latency = sum(observed) / len(observed) if observed else 0.0
+
+            def score(model):
+                stats = self._stats.get(model, ModelStats())
+                latency = stats.latency_ms if stats.latency_ms is not None else default_latency
+                return latency / stats.success_rate
+
+            return sorted(candidates, key=lambda m: (score(m), preferred.index(m)))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "available": self.available,
+                "refreshed_at": self.refreshed_at,
+                "models": {
+                    model: {
+                        "successes": s.successes,
+                        "failures": s.failures,
+                        "success_rate": round(s.success_rate, 4),
+                        "latency_ms": round(s.latency_ms, 1) if s.latency_ms is not None else None,
+                        "p95_ms": round(sorted(s.recent_ms)[int(len(s.recent_ms) * 0.95)], 1) if s.recent_ms else None,
+                        "last_error": s.last_error,
+                    }
+                    for model, s in self._stats.items()
+                },
+            }
+
+model_registry = ModelRegistry(
+    refresh_interval=float(os.getenv("GROQ_MODELS_REFRESH_INTERVAL", "600"))
+)
@@ -0,0 +1,155 @@
+import heapq
+import asyncio
+import logging
+from datetime import datetime, date, timedelta
+from typing import Any, Dict, List
+import numpy as np
+from fastapi import HTTPException
+from app.models import MultiCityRequest
+from app.services import serpapi_client
+from app.services.flight_parser import parse_leg
+from app.services.flight_results import FlightResultSet
+from app.services.flight_service import _leg_params
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# Upper bound on heap pops, so tight constraints can't turn into a full scan
+MAX_EXPANSIONS = 100_000
+
+def _leg_dates(request: MultiCityRequest) -> List[List[str]]:
+    if len(request.dates) != len(request.cities) - 1:
+        raise HTTPException(400, "Give one date per leg (one fewer than cities)")
+    if request.sort not in ("price", "duration"):
+        raise HTTPException(400, "sort must be one of price, duration")
+    try:
+        dates = [datetime.strptime(d, "%Y-%m-%d").date() for d in request.dates]
+    except ValueError:
+        raise HTTPException(400, "Dates must be YYYY-MM-DD")
+    if dates[0] < date.today():
+        raise HTTPException(400, "Departure date must be in future")
+    if any(later < earlier for earlier, later in zip(dates, dates[1:])):
+        raise HTTPException(400, "Leg dates must be in travel order")
+
+    windows = []
+    for day in dates:
+        window = [day + timedelta(days=offset) for offset in range(-request.flex_days, request.flex_days + 1)]
+        windows.append([d.isoformat() for d in window if d >= date.today()])
+    return windows
+
+async def _fetch_legs(request: MultiCityRequest, windows: List[List[str]]) -> List[FlightResultSet]:
+    """Every (leg, date) search at once; a trip costs one upstream round trip."""
+    searches = [
+        (leg, serpapi_client.search(_leg_params(
+            request, request.cities[leg], request.cities[leg + 1], day)))
+        for leg, days in enumerate(windows)
+        for day in days
+    ]
+    payloads = await asyncio.gather(*(search for _, search in searches), return_exceptions=True)
+
+    options: List[List[Dict[str, Any]]] = [[] for _ in windows]
+    for (leg, _), data in zip(searches, payloads):
+        if isinstance(data, Exception):
+            logger.warning(f"Multi-city leg {leg} search failed: {str(data)}")
+            continue
+        options[leg].extend(parse_leg(data, request.cabin_class))
+    return [FlightResultSet(leg_options) for leg_options in options]
+
+def best_itineraries(legs: List[FlightResultSet], sort: str = "price", top_n: int = 5,
+                     max_total_price: float = None, max_total_duration: int = None,
+                     min_connection_minutes: int = 0) -> List[tuple]:
+    """Best-first branch and bound over one option per leg.
+
+    Each leg's options are sorted by cost once. A search state is a prefix
+    of choices, the last being the ``rank``-th cheapest option of its leg,
+    and is keyed by its cost so far plus the cheapest possible remainder,
+    which never overestimates. Popping a state pushes at most two more:
+    the same prefix with the next option of the last leg, and the prefix
+    extended by the cheapest option of the following leg. Complete
+    itineraries therefore come off the heap in cost order, and the search
+    stops after ``top_n`` of them. States that already break the price or
+    duration cap, even with the cheapest remainder, are not extended.
+
+    Returns ``(cost, price, duration, [option index per leg])`` tuples.
+    """
+    orders, costs, prices, durations, departs, arrives = [], [], [], [], [], []
+    for leg in legs:
+        cost = leg.price if sort == "price" else leg.duration.astype(np.float64)
+        order = np.flatnonzero(~np.isnan(leg.price))
+        order = order[np.argsort(cost[order], kind="stable")]
+        if not len(order):
+            return []
+        orders.append(order)
+        costs.append(cost[order].tolist())
+        prices.append(leg.price[order].tolist())
+        durations.append(leg.duration[order].astype(np.float64).tolist())
+        departs.append(leg.departs_at[order].tolist())
+        arrives.append(leg.arrives_at[order].tolist())
+
+    # Cheapest possible cost of legs i.. onwards, per dimension
+    count = len(legs)
+    rest_cost, rest_price, rest_duration = [0.0] * (count + 1), [0.0] * (count + 1), [0.0] * (count + 1)
+    for i in range(count - 1, -1, -1):
+        rest_cost[i] = rest_cost[i + 1] + costs[i][0]
+        rest_price[i] = rest_price[i + 1] + min(prices[i])
+        rest_duration[i] = rest_duration[i + 1] + min(durations[i])
+
+    # (bound, cost of prefix without its last choice, ranks chosen so far)
+    heap = [(rest_cost[0], 0.0, (0,))]
+    results = []
+    expansions = 0
+    while heap and len(results) < top_n and expansions < MAX_EXPANSIONS:
+        bound, base, ranks = heapq.heappop(heap)
+        expansions += 1
+        if sort == "price" and max_total_price is not None and bound > max_total_price:
+            # Everything left on the heap costs at least this much
+            break
+        leg, rank = len(ranks) - 1, ranks[-1]
+
+        if rank + 1 < len(costs[leg]):
+            sibling = base + costs[leg][rank + 1] + rest_cost[leg + 1]
+            heapq.heappush(heap, (sibling, base, ranks[:-1] + (rank + 1,)))
+
+        # Reject prefixes whose flights overlap or break a cap
+        feasible = True
+        if leg > 0:
+            gap = departs[leg][rank] - arrives[leg - 1][ranks[-2]]
+            feasible = gap != gap or gap >= min_connection_minutes  # NaN: time unknown
+        price = sum(prices[i][r] for i, r in enumerate(ranks))
+        duration = sum(durations[i][r] for i, r in enumerate(ranks))
+        if max_total_price is not None and price + rest_price[leg + 1] > max_total_price:
+            feasible = False
+        if max_total_duration is not None and duration + rest_duration[leg + 1] > max_total_duration:
+            feasible = False
+        if not feasible:
+            continue
+
+        if leg + 1 == count:
+            results.append((bound, price, duration, [int(orders[i][r]) for i, r in enumerate(ranks)]))
+        else:
+            prefix = base + costs[leg][rank]
+            heapq.heappush(heap, (prefix + rest_cost[leg + 1], prefix, ranks + (0,)))
+    return results
+
+async def multi_city_service(request: MultiCityRequest) -> Dict[str, Any]:
+    windows = _leg_dates(request)
+    legs = await _fetch_legs(request, windows)
+    for i, leg in enumerate(legs):
+        if not leg.options:
+            raise HTTPException(404, f"No flights found from {request.cities[i]} to {request.cities[i + 1]}")
+
+    found = best_itineraries(
+        legs, sort=request.sort, top_n=request.top_n, max_total_price=request.max_total_price,
+        max_total_duration=request.max_total_duration, min_connection_minutes=request.min_connection_minutes
+    )
+    return {
+        "options_per_leg": [len(leg.options) for leg in legs],
+        "itineraries": [
+            {
+                "legs": [legs[i].options[index] for i, index in enumerate(indices)],
+                "total_price": price,
+                "total_duration": int(duration)
+            }
+            for _, price, duration, indices in found
+        ]
+    }
@@ -0,0 +1,102 @@
+import os
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional
+from fastapi import HTTPException
+from app import ndjson
+from app.models import FlightRequest, HotelRequest, ItineraryRequest, PlanTripRequest
+from app.services import flight_results, hotel_results
+from app.services.hotel_service import search_hotels_service
+from app.services.itinerary_service import generate_itinerary_service
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+# How long the itinerary waits for flights before planning around default times
+ARRIVAL_WAIT = float(os.getenv("PLAN_TRIP_ARRIVAL_WAIT", "10"))
+
+def _arrival_time(flight_options: Dict[str, Any]) -> Optional[str]:
+    """Landing time of the top outbound option, as the itinerary expects it."""
+    outbound = flight_options.get("outbound") or []
+    if not outbound or not outbound[0].get("segments"):
+        return None
+    arrival = outbound[0]["segments"][-1].get("arrival_time")
+    try:
+        return datetime.strptime(arrival, "%Y-%m-%d %H:%M").strftime("%I:%M %p")
+    except (TypeError, ValueError):
+        return arrival
+
+async def _hotels(request: HotelRequest) -> Dict[str, Any]:
+    hotels = await search_hotels_service(request)
+    return {"search_id": hotel_results.result_store.put(request, hotels["hotels"]), **hotels}
+
+async def _itinerary(request: PlanTripRequest, duration: int, flights: asyncio.Task) -> Dict[str, Any]:
+    arrival_time = request.arrival_time
+    if arrival_time is None:
+        try:
+            # Shielded: giving up on the wait must not cancel the flight search
+            arrival_time = _arrival_time(await asyncio.wait_for(asyncio.shield(flights), ARRIVAL_WAIT))
+        except Exception:
+            logger.info("Planning itinerary without an arrival time")
+    return await generate_itinerary_service(ItineraryRequest(
+        destination=request.location or request.destination,
+        duration=duration,
+        interests=request.interests,
+        budget=request.budget,
+        travel_style=request.travel_style,
+        arrival_time=arrival_time
+    ))
+
+async def _stream(request: PlanTripRequest, duration: int) -> AsyncIterator[str]:
+    flight_request = FlightRequest(
+        origin=request.origin, destination=request.destination,
+        outbound_date=request.outbound_date, return_date=request.return_date,
+        cabin_class=request.cabin_class, nonstop=request.nonstop
+    )
+    hotel_request = HotelRequest(
+        location=request.location or request.destination,
+        check_in_date=request.outbound_date, check_out_date=request.return_date,
+        stars=request.stars
+    )
+    flights = asyncio.create_task(flight_results.search_with_id(flight_request))
+    tasks = {
+        flights: "flights",
+        asyncio.create_task(_hotels(hotel_request)): "hotels",
+        asyncio.create_task(_itinerary(request, duration, flights)): "itinerary",
+    }
+
+    pending = set(tasks)
+    failed = []
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                part = tasks[task]
+                try:
+                    yield ndjson.event(part, task.result())
+                except HTTPException as e:
+                    failed.append(part)
+                    yield ndjson.event("error", {"part": part, "status": e.status_code, "detail": e.detail})
+                except Exception as e:
+                    logger.error(f"Plan trip {part} failed: {str(e)}")
+                    failed.append(part)
+                    yield ndjson.event("error", {"part": part, "status": 500, "detail": str(e)})
+        yield ndjson.event("done", {"failed": failed})
+    finally:
+        for task in tasks:
+            task.cancel()
+
+def plan_trip_service(request: PlanTripRequest) -> AsyncIterator[str]:
+    """Validate dates, then stream flights, hotels and the itinerary as each
+    finishes. All three start together; the itinerary only waits for the
+    flights' arrival time, and at most ``ARRIVAL_WAIT`` seconds for it.
+    """
+    try:
+        outbound = datetime.strptime(request.outbound_date, "%Y-%m-%d").date()
+        inbound = datetime.strptime(request.return_date, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(400, "Dates must be YYYY-MM-DD")
+    if inbound <= outbound:
+        raise HTTPException(400, "Return date must be after departure")
+    return _stream(request, (inbound - outbound).days)
@@ -0,0 +1,169 @@
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from typing import Any, Dict, Optional
+from app.utils import calculate_time_slots
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+
+class SemanticCache:
+    """Reuse itineraries generated for near-duplicate requests.
+
+    A canonical description of each request is embedded with a local
+    sentence-transformers model and stored in a persistent Chroma
+    collection. Lookups only consider entries with the same destination,
+    duration, budget and travel style, and return the nearest one whose
+    cosine similarity reaches ``threshold``. Both libraries are optional;
+    without them the cache stays disabled.
+    """
+
+    def __init__(self, path: str, model_name: str, threshold: float = 0.9,
+                 max_entries: int = 5000, enabled: bool = True):
+        self.path = path
+        self.model_name = model_name
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._model = None
+        self._collection = None
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.stores = 0
+        self.evictions = 0
+        self.lookup_ms_total = 0.0
+
+    def _ensure(self) -> bool:
+        if not self.enabled:
+            return False
+        if self._collection is not None:
+            return True
+        with self._lock:
+            if self._collection is None:
+                try:
+                    import chromadb
+                    from sentence_transformers import SentenceTransformer
+                except ImportError as e:
+                    logger.warning(f"Semantic cache disabled, missing dependency: {str(e)}")
+                    self.enabled = False
+                    return False
+                try:
+                    self._model = SentenceTransformer(self.model_name, device="cpu")
+                    client = chromadb.PersistentClient(path=self.path)
+                    self._collection = client.get_or_create_collection(
+                        "itineraries", metadata={"hnsw:space": "cosine"}
+                    )
+                except Exception as e:
+                    logger.warning(f"Semantic cache disabled, failed to initialize: {str(e)}")
+                    self.enabled = False
+                    return False
+        return True
+
+    @staticmethod
+    def canonical(request) -> str:
+        interests = ", ".join(sorted(i.strip().lower() for i in request.interests))
+        return (
+            f"{request.duration} day trip to {request.destination.strip().lower()}. "
+            f"interests: {interests}. budget: {request.budget.strip().lower()}. "
+            f"style: {request.travel_style.strip().lower()}."
+        )
+
+    @staticmethod
+    def _scope(request) -> Dict[str, Any]:
+        """Fields an entry must match exactly; an itinerary for another budget
+        or travel style is never a near-duplicate, however close the embedding."""
+        return {
+            "destination": request.destination.strip().lower(),
+            "duration": request.duration,
+            "budget": request.budget.strip().lower(),
+            "travel_style": request.travel_style.strip().lower(),
+        }
+
+    @classmethod
+    def _filter(cls, request) -> Dict[str, Any]:
+        return {"$and": [{field: value} for field, value in cls._scope(request).items()]}
+
+    def _embed(self, request):
+        return self._model.encode(self.canonical(request), normalize_embeddings=True).tolist()
+
+    @staticmethod
+    def adapt(itinerary: Dict[str, Any], request) -> Dict[str, Any]:
+        """Fit a cached itinerary to the new request's destination and arrival."""
+        itinerary = dict(itinerary, destination=request.destination)
+        plans = itinerary.get("daily_plans") or []
+        if request.arrival_time and plans:
+            slots = calculate_time_slots(request.arrival_time)
+            first = dict(plans[0])
+            first["time_slots"] = {
+                name: dict(slot, time=slots.get(name, slot.get("time")))
+                for name, slot in first.get("time_slots", {}).items()
+            }
+            itinerary["daily_plans"] = [first] + plans[1:]
+        return itinerary
+
+    def lookup(self, request) -> Optional[Dict[str, Any]]:
+        if not self._ensure():
+            return None
+        started = time.perf_counter()
+        self.lookups += 1
+        result = self._collection.query(
+            query_embeddings=[self._embed(request)],
+            n_results=1,
+            where=self._filter(request),
+            include=["documents", "distances", "metadatas"],
+        )
+        self.lookup_ms_total += (time.perf_counter() - started) * 1000
+        if not result["ids"] or not result["ids"][0]:
+            return None
+        similarity = 1 - result["distances"][0][0]
+        if similarity < self.threshold:
+            return None
+        self.hits += 1
+        metadata = dict(result["metadatas"][0][0], last_hit=time.time())
+        self._collection.update(ids=[result["ids"][0][0]], metadatas=[metadata])
+        logger.info(f"Semantic cache hit (similarity={similarity:.3f})")
+        return self.adapt(json.loads(result["documents"][0][0]), request)
+
+    def store(self, request, itinerary: Dict[str, Any]):
+        if not self._ensure():
+            return
+        self._collection.add(
+            ids=[uuid.uuid4().hex],
+            embeddings=[self._embed(request)],
+            documents=[json.dumps(itinerary)],
+            metadatas=[dict(self._scope(request), last_hit=time.time())],
+        )
+        self.stores += 1
+        self._evict()
+
+    def _evict(self):
+        excess = self._collection.count() - self.max_entries
+        if excess <= 0:
+            return
+        entries = self._collection.get(include=["metadatas"])
+        by_age = sorted(zip(entries["ids"], entries["metadatas"]), key=lambda e: e[1].get("last_hit", 0))
+        self._collection.delete(ids=[entry_id for entry_id, _ in by_age[:excess]])
+        self.evictions += excess
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "avg_lookup_ms": round(self.lookup_ms_total / self.lookups, 2) if self.lookups else 0.0,
+        }
+
+semantic_cache = SemanticCache(
+    path=os.getenv("SEMANTIC_CACHE_PATH", ".cache/semantic"),
+    model_name=os.getenv("SEMANTIC_CACHE_MODEL", "all-MiniLM-L6-v2"),
+    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9")),
+    max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "5000")),
+    enabled=os.getenv("SEMANTIC_CACHE_ENABLED", "1") == "1",
+)
@@ -0,0 +1,151 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app import metrics
+from app.disk_cache import disk_cache
+from app.cache import ResponseCache, make_key
+from app.ratelimit import TokenBucket
+from app.singleflight import SingleFlight
+
+# Initialize logger
+logger = logging.getLogger(__name__)
+# httpx logs full request URLs at INFO, which would leak the API key
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+DEFAULT_SERPAPI_URL = "https://serpapi.com/search"
+
+# Fares and rates move on the scale of minutes, so identical searches
+# within the TTL are answered from memory instead of spending SerpAPI quota.
+DEFAULT_TTLS = {"google_flights": 300, "google_hotels": 900}
+
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "2000")),
+    max_bytes=int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+    stale_ttl=float(os.getenv("SEARCH_CACHE_STALE_TTL", "1800")),
+)
+
+# Concurrent misses for the same search share one upstream call
+inflight = SingleFlight("serpapi")
+
+# Only calls that actually reach SerpAPI spend tokens; cache hits are free
+rate_limiter = TokenBucket(
+    "serpapi",
+    rate=float(os.getenv("SERPAPI_RATE_LIMIT", "10")),
+    burst=int(os.getenv("SERPAPI_RATE_BURST", "20")),
+)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared keep-alive client, creating it on first use.
+
+    Pool limits are read from the environment so they can be tuned per
+    deployment; the defaults allow a few hundred searches in flight from
+    a single worker.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        max_connections = int(os.getenv("SERPAPI_MAX_CONNECTIONS", "100"))
+        http2 = os.getenv("SERPAPI_HTTP2", "1") == "1" and _http2_available()
+        _client = httpx.AsyncClient(
+            http2=http2,
+            timeout=float(os.getenv("SERPAPI_TIMEOUT", "30")),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=int(os.getenv("SERPAPI_MAX_KEEPALIVE", "20")),
+                keepalive_expiry=float(os.getenv("SERPAPI_KEEPALIVE_EXPIRY", "30")),
+            ),
+        )
+        logger.info(f"SerpAPI client ready (http2={http2}, max_connections={max_connections})")
+    return _client
+
+
+async def close_client():
+    global _client
+    await response_cache.close()
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def cache_ttl(engine: str) -> float:
+    default = DEFAULT_TTLS.get(engine, 300)
+    return float(os.getenv(f"SEARCH_CACHE_TTL_{engine.upper()}", default))
+
+
+def cache_key(params: Dict[str, Any]) -> str:
+    return make_key("serpapi", params)
+
+
+def is_cached(params: Dict[str, Any]) -> bool:
+    """Whether a search would be answered from memory without going upstream."""
+    return response_cache.fresh(cache_key(params))
+
+
+async def _fetch(params: Dict[str, Any]):
+    url = os.getenv("SERPAPI_URL", DEFAULT_SERPAPI_URL)
+    query = {**params, "api_key": os.getenv("SERPAPI_API_KEY")}
+    await rate_limiter.acquire()
+    engine = params.get("engine", "")
+    started = time.perf_counter()
+    try:
+        res = await get_client().get(url, params=query)
+    except httpx.HTTPError as e:
+        metrics.observe_upstream("serpapi", engine, type(e).__name__, time.perf_counter() - started)
+        raise
+    metrics.observe_upstream("serpapi", engine, str(res.status_code), time.perf_counter() - started)
+    with metrics.parse_seconds.labels("serpapi_json").time():
+        payload = res.json()
+    return payload, len(res.content)
+
+
+async def _fetch_through_disk(key: str, params: Dict[str, Any], ttl: float):
+    """Check the host-wide disk cache before spending SerpAPI quota.
+
+    Returns ``(payload, size, ttl)``. For a disk hit ``ttl`` is what is left
+    of the entry's lifetime, so the memory copy expires with it instead of
+    starting a fresh TTL.
+    """
+    if disk_cache.enabled:
+        cached = await asyncio.to_thread(disk_cache.get_entry, key)
+        if cached is not None:
+            (payload, size), remaining = cached
+            return payload, size, remaining
+    payload, size = await _fetch(params)
+    if disk_cache.enabled and "error" not in payload:
+        await asyncio.to_thread(disk_cache.set, key, (payload, size), ttl)
+    return payload, size, ttl
+
+
+async def search(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a SerpAPI search and return the decoded JSON payload.
+
+    Results are cached per normalized parameter set, in memory and in the
+    shared disk cache, and concurrent misses for the same set are
+    coalesced; error payloads are returned to the caller but never cached.
+    """
+    ttl = cache_ttl(params.get("engine", ""))
+    key = cache_key(params)
+    payload, _, _ = await response_cache.get_or_fetch(
+        key,
+        lambda: inflight.do(key, lambda: _fetch_through_disk(key, params, ttl)),
+        ttl=ttl,
+        size_of=lambda value: value[1],
+        cacheable=lambda value: "error" not in value[0],
+        ttl_of=lambda value: value[2],
+    )
+    return payload
@@ -52,6 +52,7 @@ def clean_hotel_data(hotel: dict, location: str) -> dict:
         or hotel.get("review_score")
         or hotel.get("stars")
         or hotel.get("user_rating")
+        or hotel.get("overall_rating")
         or None
     )
     
@@ -78,16 +79,21 @@ def clean_hotel_data(hotel: dict, location: str) -> dict:
     
     price = str(hotel.get("rate_per_night", {}).get("lowest", "N/A"))
     price = price.replace("₹", "").strip()
+
+    gps = hotel.get("gps_coordinates") or {}
+    maps_query = urllib.parse.quote(f"{hotel.get('name')} {address}")
     
     return {
         "name": hotel.get("name", "Unknown Hotel").strip(),
         "price": price,
         "rating": rating,
-        "stars": int(hotel.get("stars", 0)),
+        "stars": int(hotel.get("stars") or hotel.get("extracted_hotel_class") or 0),
         "address": address,
         "photos": photos,
         "amenities": hotel.get("amenities", ["WiFi", "Pool", "AC"])[:5],
-        "maps_link": f"https://www.google.com/maps/search/?api=1&query={urllib.parse.quote(f'{hotel.get("name")} {address}')}",
+        "maps_link": f"https://www.google.com/maps/search/?api=1&query={maps_query}",
         "check_in": hotel.get("check_in_date"),
-        "check_out": hotel.get("check_out_date")
+        "check_out": hotel.get("check_out_date"),
+        "latitude": gps.get("latitude"),
+        "longitude": gps.get("longitude")
     }
\ No newline at end of file
@@ -0,0 +1,116 @@
+# backend/benchmarks/bench_cold_start.py
+"""Worker cold start: ``import app.main`` and time to the first healthy /health.
+
+Each run starts a fresh interpreter, so nothing is served from an already
+warm ``sys.modules``. The import is timed inside the child process; the
+health time is measured from spawning ``uvicorn app.main:app`` until
+``GET /health`` first answers 200, which is when a new worker can take
+traffic. Upstream URLs point at a closed local port so background calls
+fail fast offline.
+
+The run fails (exit status 1) when a median is over its budget, or when
+an SDK that should load on first use is imported at start-up:
+
+    cd backend && python -m benchmarks.bench_cold_start
+    COLD_START_HEALTH_BUDGET_MS=1000 python -m benchmarks.bench_cold_start
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.stub_upstream import _free_port
+
+RUNS = 5
+IMPORT_BUDGET_MS = float(os.getenv("COLD_START_IMPORT_BUDGET_MS", "1000"))
+HEALTH_BUDGET_MS = float(os.getenv("COLD_START_HEALTH_BUDGET_MS", "1500"))
+# Heavy optional or rarely used SDKs that must not load with the app
+LAZY_MODULES = ("groq", "sendgrid", "requests", "chromadb", "sentence_transformers", "torch")
+
+IMPORT_PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": elapsed, "loaded": [m for m in {LAZY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def _env(tmp):
+    env = dict(os.environ)
+    env.setdefault("SERPAPI_API_KEY", "stub")
+    env.setdefault("GROQ_API_KEY", "stub")
+    env.update({
+        "GROQ_BASE_URL": "http://127.0.0.1:9",
+        "SERPAPI_URL": "http://127.0.0.1:9/search",
+        "SENDGRID_API_URL": "http://127.0.0.1:9/v3/mail/send",
+        "DISK_CACHE_PATH": os.path.join(tmp, "cache.sqlite3"),
+        "EMAIL_OUTBOX_PATH": os.path.join(tmp, "outbox.sqlite3"),
+        "SEMANTIC_CACHE_PATH": os.path.join(tmp, "semantic"),
+    })
+    return env
+
+
+def _import_run(env):
+    out = subprocess.run([sys.executable, "-c", IMPORT_PROBE], env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _health_run(env, timeout=30.0):
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(timeout=1.0) as client:
+            while time.perf_counter() - start < timeout:
+                try:
+                    if client.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                        return (time.perf_counter() - start) * 1000
+                except httpx.TransportError:
+                    pass
+                if proc.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with status {proc.returncode}")
+                time.sleep(0.005)
+        raise RuntimeError(f"/health not healthy after {timeout:.0f}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _env(tmp)
+        imports = [_import_run(env) for _ in range(RUNS)]
+        health_ms = [_health_run(env) for _ in range(RUNS)]
+
+    import_ms = [run["ms"] for run in imports]
+    loaded = sorted({m for run in imports for m in run["loaded"]})
+    results = [
+        ("import app.main", import_ms, IMPORT_BUDGET_MS),
+        ("first healthy /health", health_ms, HEALTH_BUDGET_MS),
+    ]
+
+    failed = False
+    print(f"{RUNS} cold starts each")
+    for name, samples, budget in results:
+        median = statistics.median(samples)
+        verdict = "ok" if median <= budget else "OVER BUDGET"
+        failed |= median > budget
+        print(f"{name:>22}: median={median:7.1f}ms  max={max(samples):7.1f}ms  budget={budget:.0f}ms  {verdict}")
+    if loaded:
+        failed = True
+        print(f"imported at start-up but should load on first use: {', '.join(loaded)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
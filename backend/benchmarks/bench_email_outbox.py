@@ -0,0 +1,148 @@
+# backend/benchmarks/bench_email_outbox.py
+"""Email outbox load test against a local stub SendGrid.
+
+Enqueues ``MESSAGES`` itinerary emails through
+``send_itinerary_email_service``, ``CONCURRENCY`` at a time, while the
+background sender drains the outbox to the stub. Reports what the client
+sees (enqueue latency) separately from delivery (time until every message
+is sent, including retries of the stub's injected 503s).
+
+Then one itinerary goes to a ``GROUP``-person trip, once as one call per
+address and once through ``send_bulk_itinerary_email_service``, counting
+the SendGrid calls each makes.
+
+    cd backend && python -m benchmarks.bench_email_outbox
+"""
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.stub_upstream import StubServer, create_app
+
+MESSAGES = 300
+CONCURRENCY = 50
+WORKERS = 16
+SENDGRID_MS = 200
+FAILURE_RATE = 0.1
+GROUP = 30
+
+
+def _itinerary(i):
+    return {
+        "destination": f"City {i % 20}",
+        "summary": "A week of food, beaches and old streets.",
+        "daily_plans": [
+            {
+                "day": day,
+                "date": f"2026-12-{day:02d}",
+                "time_slots": {
+                    slot: {"time": "09:00 AM", "activities": ["Walk the old town", "Lunch by the sea"]}
+                    for slot in ("morning", "afternoon", "evening")
+                },
+                "highlights": ["Sunset"],
+            }
+            for day in range(1, 8)
+        ],
+        "packing_list": ["Sunscreen", "Sandals"],
+        "local_tips": ["Carry cash"],
+    }
+
+
+async def _settle(outbox, total):
+    while outbox.stats()["sent"] + outbox.stats()["failed"] < total:
+        await asyncio.sleep(0.05)
+
+
+async def _group(stub):
+    """SendGrid calls and seconds to deliver one itinerary to GROUP people."""
+    from app.models import BulkEmailRecipient, BulkEmailRequest, EmailRequest
+    from app.outbox import outbox
+    from app.services.email_service import send_bulk_itinerary_email_service, send_itinerary_email_service
+
+    itinerary = _itinerary(0)
+    addresses = [f"friend{i}@example.com" for i in range(GROUP)]
+
+    async def one_by_one():
+        for address in addresses:
+            await send_itinerary_email_service(EmailRequest(email=address, itinerary=itinerary))
+
+    async def bulk():
+        await send_bulk_itinerary_email_service(BulkEmailRequest(
+            itinerary=itinerary,
+            recipients=[BulkEmailRecipient(email=a, name=f"Friend {i}") for i, a in enumerate(addresses)],
+        ))
+
+    results = {}
+    for name, send in (("one by one", one_by_one), ("bulk", bulk)):
+        calls = len(stub.state.emails) + stub.state.email_failures
+        total = sum(outbox.stats().values()) + (GROUP if name == "one by one" else 1)
+        start = time.perf_counter()
+        await send()
+        await _settle(outbox, total)
+        results[name] = (len(stub.state.emails) + stub.state.email_failures - calls, time.perf_counter() - start)
+    return results
+
+
+async def _run(stub):
+    from app.models import EmailRequest
+    from app.outbox import outbox
+    from app.services.email_sender import email_sender
+    from app.services.email_service import send_itinerary_email_service
+
+    await email_sender.start()
+    slots = asyncio.Semaphore(CONCURRENCY)
+    enqueue_ms = []
+    message_ids = []
+
+    async def enqueue(i):
+        async with slots:
+            start = time.perf_counter()
+            res = await send_itinerary_email_service(
+                EmailRequest(email=f"traveller{i}@example.com", itinerary=_itinerary(i)))
+            enqueue_ms.append((time.perf_counter() - start) * 1000)
+            message_ids.append(res["message_id"])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(enqueue(i) for i in range(MESSAGES)))
+    enqueued = time.perf_counter() - start
+    await _settle(outbox, MESSAGES)
+    drained = time.perf_counter() - start
+
+    stats = {
+        "outbox": outbox.stats(),
+        "sender": email_sender.stats(),
+        "stub": (len(stub.state.emails), stub.state.email_failures),
+    }
+    group = await _group(stub)
+    await email_sender.stop()
+    outbox.close()
+    return enqueue_ms, enqueued, drained, stats, group
+
+
+def main():
+    app = create_app(sendgrid_latency_ms=SENDGRID_MS, sendgrid_failure_rate=FAILURE_RATE)
+    with StubServer(app) as stub, tempfile.TemporaryDirectory() as tmp:
+        os.environ["SENDGRID_API_URL"] = f"{stub.url}/v3/mail/send"
+        os.environ["EMAIL_OUTBOX_PATH"] = os.path.join(tmp, "outbox.sqlite3")
+        os.environ.setdefault("EMAIL_SENDER_WORKERS", str(WORKERS))
+        os.environ.setdefault("EMAIL_BACKOFF_BASE", "0.2")
+        os.environ.setdefault("SENDGRID_FROM_EMAIL", "bench@example.com")
+        enqueue_ms, enqueued, drained, stats, group = asyncio.run(_run(app))
+
+    enqueue_ms.sort()
+    print(f"{MESSAGES} emails, {CONCURRENCY} concurrent clients, {stats['sender']['workers']} sender workers, "
+          f"stub SendGrid {SENDGRID_MS}ms with {FAILURE_RATE:.0%} 503s")
+    print(f"enqueue: median={statistics.median(enqueue_ms):6.2f}ms  "
+          f"p99={enqueue_ms[int(len(enqueue_ms) * 0.99) - 1]:6.2f}ms  all queued in {enqueued:.2f}s")
+    print(f"delivery: all settled in {drained:.2f}s ({MESSAGES / drained:.0f} emails/s), "
+          f"stub accepted {stats['stub'][0]}, rejected {stats['stub'][1]}")
+    print(f"outbox: {stats['outbox']}")
+    print(f"sender: {stats['sender']}")
+    for name, (calls, seconds) in group.items():
+        print(f"{GROUP}-person group, {name:>10}: {calls:3d} SendGrid calls, delivered in {seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# backend/benchmarks/bench_email_render.py
+"""Itinerary email rendering: nested f-strings vs the compiled templates.
+
+The legacy path below is the body ``send_itinerary_email_service`` used to
+build inline on every call. The template path is
+``email_renderer.render_html``; the cached path is ``render_cache.render``,
+which is what the service now calls, for an itinerary sent again.
+
+Time is the mean per render. Memory is tracemalloc's peak traced size
+during one render, alongside the size of the HTML produced.
+
+    cd backend && python -m benchmarks.bench_email_render
+"""
+import re
+import time
+import tracemalloc
+
+from app.services.email_renderer import RenderCache, render_html
+
+DAYS = 14
+REPEAT = 200
+
+
+def legacy_render(itinerary, personal_message):
+    return f"""
+    <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                <h1 style="color: #0066cc;">✈️ Your Travel Itinerary to {itinerary.get('destination', 'your destination')}</h1>
+                
+                {f'<p style="font-size: 16px;">{itinerary.get("summary", "")}</p>' if itinerary.get("summary") else ''}
+                
+                {f'<p style="background: #f0f8ff; padding: 10px; border-radius: 5px;"><strong>Personal Note:</strong> {personal_message}</p>' if personal_message else ''}
+                
+                <h2 style="color: #0066cc; border-bottom: 2px solid #0066cc; padding-bottom: 5px;">📅 Daily Plans</h2>
+                
+                {''.join([
+                    f"""
+                    <div style="margin-bottom: 25px; border: 1px solid #ddd; border-radius: 5px; padding: 15px; background: #f9f9f9;">
+                        <h3 style="color: #0066cc;">Day {day['day']}: {day.get('date', '')}</h3>
+                        {f'<p><strong>✈️ Flight Arrival:</strong> {day.get("arrival_info", "")}</p>' if day.get("arrival_info") else ''}
+                        
+                        {''.join([
+                            f"""
+                            <div style="margin: 15px 0;">
+                                <h4 style="color: #0066cc; margin-bottom: 5px;">{slot_name.title()} ({slot['time']})</h4>
+                                <ul style="margin-top: 5px; padding-left: 20px;">
+                                    {''.join([f'<li style="margin-bottom: 5px;">{activity}</li>' for activity in slot.get("activities", [])])}
+                                </ul>
+                            </div>
+                            """ for slot_name, slot in day.get('time_slots', {}).items()
+                        ])}
+                        
+                        {f'<p style="margin-top: 10px;"><strong>🌟 Highlights:</strong> {", ".join(day.get("highlights", []))}</p>' if day.get("highlights") else ''}
+                    </div>
+                    """ for day in itinerary.get('daily_plans', [])
+                ])}
+                
+                <div style="display: flex; margin-top: 30px;">
+                    <div style="flex: 1; padding: 10px; background: #f0f8ff; border-radius: 5px; margin-right: 10px;">
+                        <h3 style="color: #0066cc;">🧳 Packing List</h3>
+                        <ul style="padding-left: 20px;">
+                            {''.join([f'<li style="margin-bottom: 5px;">{item}</li>' for item in itinerary.get('packing_list', [])])}
+                        </ul>
+                    </div>
+                    
+                    <div style="flex: 1; padding: 10px; background: #f0f8ff; border-radius: 5px;">
+                        <h3 style="color: #0066cc;">💡 Local Tips</h3>
+                        <ul style="padding-left: 20px;">
+                            {''.join([f'<li style="margin-bottom: 5px;">{tip}</li>' for tip in itinerary.get('local_tips', [])])}
+                        </ul>
+                    </div>
+                </div>
+                
+                <p style="margin-top: 30px; text-align: center; font-style: italic;">
+                    Happy travels! ✈️🌍<br>
+                    <span style="color: #0066cc;">Travel Planner Pro</span>
+                </p>
+            </div>
+        </body>
+    </html>
+    """
+
+def itinerary(days=DAYS):
+    return {
+        "destination": "Chennai",
+        "summary": "Two weeks of temples, beaches and food along the Coromandel coast.",
+        "daily_plans": [
+            {
+                "day": d + 1,
+                "date": f"2025-12-{d + 1:02d}",
+                "arrival_info": "Flight lands at 10:45 AM, Terminal 1" if d == 0 else "",
+                "time_slots": {
+                    slot: {
+                        "time": hours,
+                        "activities": [f"{slot.title()} activity {i + 1} on day {d + 1}" for i in range(3)],
+                    }
+                    for slot, hours in (("morning", "9:00 AM - 12:00 PM"),
+                                        ("afternoon", "1:00 PM - 5:00 PM"),
+                                        ("evening", "6:00 PM - 10:00 PM"))
+                },
+                "highlights": [f"Highlight {i + 1}" for i in range(3)],
+            }
+            for d in range(days)
+        ],
+        "packing_list": ["Sunscreen", "Light cotton clothes", "Sandals", "Umbrella", "Power bank"],
+        "local_tips": ["Carry cash for autos", "Temples need covered shoulders", "Try filter coffee"],
+    }
+
+
+def _normalized(html):
+    return re.sub(r"\s+<", "<", re.sub(r">\s+", ">", html.strip()))
+
+
+def _time(fn):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+
+def _peak(fn):
+    tracemalloc.start()
+    html = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, len(html.encode("utf-8"))
+
+
+def main():
+    plan, message = itinerary(), "Have a wonderful trip!"
+    # Same markup, ignoring whitespace between tags, before comparing speed
+    assert _normalized(legacy_render(plan, message)) == _normalized(render_html(plan, message))
+
+    cache = RenderCache()
+    cache.render(plan, message)
+    variants = {
+        "legacy": lambda: legacy_render(plan, message),
+        "template": lambda: render_html(plan, message),
+        "cached": lambda: cache.render(plan, message),
+    }
+    print(f"{DAYS}-day itinerary, {REPEAT} renders each")
+    for name, fn in variants.items():
+        ms = _time(fn)
+        peak, size = _peak(fn)
+        print(f"{name:>9}: {ms:7.3f}ms  peak={peak / 1024:6.1f}KiB  html={size / 1024:5.1f}KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# backend/benchmarks/bench_flight_pairing.py
+"""k-best round-trip pairing: every pair enumerated vs the heap merge.
+
+The baseline builds every (outbound, return) combination, filters it and
+sorts it, which is what pairing the two lists by hand amounts to. The heap
+merge in ``flight_pairing.k_best_pairs`` only visits pairs in cost order.
+
+    cd backend && python -m benchmarks.bench_flight_pairing
+"""
+import time
+
+import numpy as np
+
+from app.services.flight_parser import parse_leg
+from app.services.flight_pairing import k_best_pairs
+from app.services.flight_results import FlightResultSet
+from benchmarks.stub_upstream import flight_payload
+
+K = 10
+REPEAT = 20
+MIN_LAYOVER = 120
+
+
+def _all_pairs(outbound, inbound, k):
+    pairs = []
+    for i in range(len(outbound.options)):
+        for j in range(len(inbound.options)):
+            stay = inbound.departs_at[j] - outbound.arrives_at[i]
+            if np.isnan(stay) or stay < MIN_LAYOVER:
+                continue
+            pairs.append((outbound.price[i] + inbound.price[j], i, j))
+    pairs.sort()
+    return pairs[:k]
+
+
+def _time(fn):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        result = fn()
+    return (time.perf_counter() - start) / REPEAT * 1000, result
+
+
+def main():
+    for count in (50, 200, 500):
+        outbound = FlightResultSet(parse_leg(flight_payload("DEL", "MAA", "2025-12-01", count=count, seed=1), "economy"))
+        inbound = FlightResultSet(parse_leg(flight_payload("MAA", "DEL", "2025-12-01", count=count, seed=2), "economy"))
+        enumerate_ms, expected = _time(lambda: _all_pairs(outbound, inbound, K))
+        heap_ms, pairs = _time(lambda: k_best_pairs(outbound, inbound, k=K, min_layover_minutes=MIN_LAYOVER))
+        # Same prices in the same order before comparing speed
+        assert [p[2] for p in pairs] == [float(p[0]) for p in expected]
+        print(f"{count:>4} x {count:<4} options: all pairs={enumerate_ms:8.2f}ms  heap={heap_ms:6.2f}ms  "
+              f"speedup={enumerate_ms / heap_ms:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
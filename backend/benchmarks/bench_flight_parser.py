@@ -0,0 +1,106 @@
+# backend/benchmarks/bench_flight_parser.py
+"""Flight payload parsing: per-segment Pydantic path vs the one-pass parser.
+
+The previous path built a ``FlightSegment``/``FlightOption`` per result,
+formatted every time with strptime/strftime, then FastAPI validated the
+whole ``Dict[str, List[FlightOption]]`` again before serializing. The new
+path is ``flight_parser.parse_leg`` plus a plain JSON encode.
+
+Recorded SerpAPI google_flights responses dropped into
+``benchmarks/fixtures/*.json`` are used when present; otherwise payloads in
+the same shape are generated by the stub upstream.
+
+    cd backend && python -m benchmarks.bench_flight_parser
+"""
+import glob
+import json
+import os
+import time
+from typing import Dict, List
+
+from pydantic import TypeAdapter
+
+from app.models import FlightOption, FlightSegment
+from app.services.flight_parser import format_time_cached, parse_leg
+from app.utils import format_time
+from benchmarks.stub_upstream import flight_payload
+
+REPEAT = 50
+response_adapter = TypeAdapter(Dict[str, List[FlightOption]])
+
+
+def _legacy_parse_leg(data, cabin_class):
+    options = []
+    for flight in data.get("best_flights", []):
+        segments = []
+        for segment in flight.get("flights", []):
+            segments.append(FlightSegment(
+                airline=segment.get("airline", "Unknown"),
+                flight_number=segment.get("flight_number", "N/A"),
+                departure_airport=segment.get("departure_airport", {}).get("name", "N/A"),
+                departure_terminal=segment.get("departure_airport", {}).get("terminal"),
+                departure_time=format_time(segment.get("departure_airport", {}).get("time")),
+                arrival_airport=segment.get("arrival_airport", {}).get("name", "N/A"),
+                arrival_terminal=segment.get("arrival_airport", {}).get("terminal"),
+                arrival_time=format_time(segment.get("arrival_airport", {}).get("time")),
+                duration=int(segment.get("duration", 0)),
+                aircraft=segment.get("aircraft", "Unknown"),
+                baggage=segment.get("baggage", "1 x 15kg"),
+                cabin_class=cabin_class,
+                amenities=["entertainment"] if cabin_class != "economy" else []
+            ))
+        options.append(FlightOption(
+            total_price=f"₹{flight.get('price', 'N/A')}",
+            total_duration=int(flight.get("total_duration", 0)),
+            stops=len(segments) - 1,
+            segments=segments,
+            booking_link=flight.get("travel_ads", [{}])[0].get("link", "#"),
+            fare_rules={"cancellation": "Free within 24h", "baggage": "1 checked + 1 cabin"}
+        ))
+    return options
+
+
+def legacy_path(payload):
+    result = {"outbound": _legacy_parse_leg(payload, "business"), "return": []}
+    # What FastAPI's response_model did on the way out
+    return response_adapter.dump_json(response_adapter.validate_python(result))
+
+
+def fast_path(payload):
+    result = {"outbound": parse_leg(payload, "business"), "return": []}
+    return json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _fixtures():
+    here = os.path.dirname(__file__)
+    recorded = sorted(glob.glob(os.path.join(here, "fixtures", "*.json")))
+    if recorded:
+        for path in recorded:
+            with open(path, encoding="utf-8") as f:
+                yield os.path.basename(path), json.load(f)
+        return
+    for count in (10, 50, 200):
+        yield f"generated-{count}", flight_payload("DEL", "MAA", "2025-12-01", count=count, seed=count)
+
+
+def _time(fn, payload):
+    format_time_cached.cache_clear()
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn(payload)
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+
+def main():
+    for name, payload in _fixtures():
+        # Same options, same JSON fields, before comparing speed
+        assert json.loads(legacy_path(payload)) == json.loads(fast_path(payload))
+        options = len(payload.get("best_flights", []))
+        legacy = _time(legacy_path, payload)
+        fast = _time(fast_path, payload)
+        print(f"{name:>14} ({options:>3} options): legacy={legacy:7.3f}ms  fast={fast:7.3f}ms  "
+              f"speedup={legacy / fast:4.1f}x")
+
+
+if __name__ == "__main__":
+    main()
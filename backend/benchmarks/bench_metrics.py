@@ -0,0 +1,117 @@
+# backend/benchmarks/bench_metrics.py
+"""Cost of the metrics instrumentation.
+
+Times the primitives on their own (a counter increment, a histogram
+observation, a timed block) and the per-request overhead of
+``MetricsMiddleware``. For the latter, a minimal FastAPI app is called
+directly over ASGI, with and without the middleware, so no network or
+server time is mixed in. Rendering a scrape is timed with as many series
+as a busy worker would have.
+
+    cd backend && python -m benchmarks.bench_metrics
+"""
+import asyncio
+import statistics
+import time
+
+from fastapi import FastAPI
+
+from app import metrics
+
+CALLS = 100_000
+REQUESTS = 10_000
+RUNS = 5
+
+
+def _per_call_ns(fn, calls=CALLS):
+    samples = []
+    for _ in range(RUNS):
+        start = time.perf_counter_ns()
+        for _ in range(calls):
+            fn()
+        samples.append((time.perf_counter_ns() - start) / calls)
+    return statistics.median(samples)
+
+
+def _primitives():
+    counter = metrics.Counter("bench_total", "bench", ("route",))
+    histogram = metrics.Histogram("bench_seconds", "bench", ("route",))
+    series = histogram.labels("/search_flights")
+
+    def timed():
+        with series.time():
+            pass
+
+    return {
+        "counter.labels(...).inc()": _per_call_ns(lambda: counter.labels("/search_flights").inc()),
+        "histogram.labels(...).observe()": _per_call_ns(lambda: histogram.labels("/search_flights").observe(0.12)),
+        "with series.time()": _per_call_ns(timed),
+    }
+
+
+def _app(instrumented: bool):
+    app = FastAPI()
+
+    @app.get("/ping/{item}")
+    async def ping(item: str):
+        return {"item": item}
+
+    if instrumented:
+        app.add_middleware(metrics.MetricsMiddleware)
+    return app
+
+
+async def _per_request_us(app):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/ping/42", "raw_path": b"/ping/42", "root_path": "",
+        "query_string": b"", "headers": [], "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    # Build the middleware stack before timing
+    await app(dict(scope), receive, send)
+    samples = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            await app(dict(scope), receive, send)
+        samples.append((time.perf_counter() - start) / REQUESTS * 1e6)
+    return statistics.median(samples)
+
+
+def _scrape_ms():
+    registry = metrics.Registry()
+    requests = registry.register(metrics.Counter("r_total", "r", ("method", "route", "status")))
+    latency = registry.register(metrics.Histogram("r_seconds", "r", ("method", "route")))
+    for i in range(40):
+        route = f"/route_{i}"
+        latency.labels("GET", route).observe(0.05)
+        for status in ("200", "404", "500"):
+            requests.labels("GET", route, status).inc()
+    start = time.perf_counter()
+    for _ in range(100):
+        text = registry.render()
+    return (time.perf_counter() - start) / 100 * 1000, len(text.splitlines())
+
+
+def main():
+    for name, ns in _primitives().items():
+        print(f"{name:>32}: {ns:6.0f} ns")
+
+    plain = asyncio.run(_per_request_us(_app(False)))
+    instrumented = asyncio.run(_per_request_us(_app(True)))
+    print(f"{'request without middleware':>32}: {plain:6.1f} us")
+    print(f"{'request with middleware':>32}: {instrumented:6.1f} us  (+{instrumented - plain:.1f} us)")
+
+    scrape_ms, lines = _scrape_ms()
+    print(f"{'scrape of ' + str(lines) + ' lines':>32}: {scrape_ms:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
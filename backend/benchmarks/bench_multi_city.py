@@ -0,0 +1,76 @@
+# backend/benchmarks/bench_multi_city.py
+"""Four-city trip latency against a local stub SerpAPI.
+
+Compares searching the three legs one after the other with
+``multi_city_service``, which fetches every leg at once and then runs the
+branch-and-bound search locally.
+
+    cd backend && python -m benchmarks.bench_multi_city
+"""
+import asyncio
+import os
+import statistics
+import time
+from datetime import date, timedelta
+
+from benchmarks.stub_upstream import StubServer, create_app
+
+CITIES = ["DEL", "BOM", "GOI", "BLR"]
+LATENCY_MS = 250
+RUNS = 5
+
+
+def _request(run: int):
+    from app.models import MultiCityRequest
+    # A new date per run so neither variant is served from the search cache
+    start = date.today() + timedelta(days=30 + run)
+    return MultiCityRequest(
+        cities=CITIES,
+        dates=[(start + timedelta(days=3 * i)).isoformat() for i in range(len(CITIES) - 1)],
+    )
+
+
+async def _sequential(request):
+    from app.services import flight_service, serpapi_client
+    from app.services.flight_parser import parse_leg
+    legs = []
+    for i, day in enumerate(request.dates):
+        data = await serpapi_client.search(flight_service._leg_params(
+            request, request.cities[i], request.cities[i + 1], day))
+        legs.append(parse_leg(data, request.cabin_class))
+    return legs
+
+
+async def _concurrent(request):
+    from app.services.multi_city_service import multi_city_service
+    return await multi_city_service(request)
+
+
+async def _run():
+    from app.services import serpapi_client
+    results = {"sequential": [], "concurrent": []}
+    for run in range(RUNS):
+        for offset, (name, fn) in enumerate((("sequential", _sequential), ("concurrent", _concurrent))):
+            request = _request(run * 2 + offset)
+            start = time.perf_counter()
+            await fn(request)
+            results[name].append((time.perf_counter() - start) * 1000)
+    await serpapi_client.close_client()
+    return results
+
+
+def main():
+    os.environ["DISK_CACHE_ENABLED"] = "0"
+    app = create_app(default_latency_ms=LATENCY_MS)
+    with StubServer(app) as stub:
+        os.environ["SERPAPI_URL"] = f"{stub.url}/search"
+        os.environ.setdefault("SERPAPI_API_KEY", "stub")
+        results = asyncio.run(_run())
+
+    print(f"{len(CITIES)} cities, stub latency {LATENCY_MS}ms per leg, {RUNS} runs each")
+    for name, samples in results.items():
+        print(f"{name:>10}: median={statistics.median(samples):7.1f}ms  max={max(samples):7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# backend/benchmarks/bench_round_trip.py
+"""Round-trip flight search latency against a local stub SerpAPI.
+
+Compares fetching the outbound and return legs one after the other (the
+previous behaviour) with the concurrent fetch in ``search_flights_service``.
+
+    cd backend && python -m benchmarks.bench_round_trip
+"""
+import asyncio
+import os
+import statistics
+import time
+from datetime import date, timedelta
+
+from benchmarks.stub_upstream import StubServer, create_app
+
+OUTBOUND_MS = 300
+RETURN_MS = 200
+RUNS = 10
+
+
+async def _sequential(request):
+    from app.services import flight_service, serpapi_client
+    from app.services.flight_parser import parse_leg
+    outbound = await serpapi_client.search(flight_service._leg_params(
+        request, request.origin, request.destination, request.outbound_date, request.return_date))
+    inbound = await serpapi_client.search(flight_service._leg_params(
+        request, request.destination, request.origin, request.return_date))
+    return parse_leg(outbound, request.cabin_class), parse_leg(inbound, request.cabin_class)
+
+
+async def _concurrent(request):
+    from app.services import flight_service
+    return await flight_service.search_flights_service(request)
+
+
+def _request(run: int):
+    from app.models import FlightRequest
+    # A new date per run so neither variant is served from the search cache
+    outbound_date = date.today() + timedelta(days=30 + run)
+    return FlightRequest(
+        origin="DEL", destination="MAA",
+        outbound_date=outbound_date.isoformat(),
+        return_date=(outbound_date + timedelta(days=7)).isoformat(),
+        search_return=True,
+    )
+
+
+async def _run():
+    from app.services import serpapi_client
+
+    # Warm the connection pool so both variants reuse connections
+    await _concurrent(_request(RUNS * 2))
+
+    results = {"sequential": [], "concurrent": []}
+    for run in range(RUNS):
+        for offset, (name, fn) in enumerate((("sequential", _sequential), ("concurrent", _concurrent))):
+            request = _request(run * 2 + offset)
+            start = time.perf_counter()
+            await fn(request)
+            results[name].append((time.perf_counter() - start) * 1000)
+    await serpapi_client.close_client()
+    return results
+
+
+def main():
+    os.environ["DISK_CACHE_ENABLED"] = "0"
+    app = create_app(latency_ms={"DEL": OUTBOUND_MS, "MAA": RETURN_MS})
+    with StubServer(app) as stub:
+        os.environ["SERPAPI_URL"] = f"{stub.url}/search"
+        os.environ.setdefault("SERPAPI_API_KEY", "stub")
+        results = asyncio.run(_run())
+
+    print(f"stub latency: outbound={OUTBOUND_MS}ms return={RETURN_MS}ms, {RUNS} runs each")
+    for name, samples in results.items():
+        print(f"{name:>10}: median={statistics.median(samples):7.1f}ms  max={max(samples):7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# backend/benchmarks/bench_semantic_cache.py
+"""Semantic itinerary cache lookup latency against index size.
+
+Fills a throwaway Chroma collection with synthetic entries and times the
+filtered nearest-neighbour query used by ``SemanticCache.lookup``. Embedding
+time is measured separately since it does not depend on index size. Needs
+the optional ``sentence-transformers`` and ``chromadb`` packages; runs
+offline once the embedding model is in the local cache.
+
+    cd backend && python -m benchmarks.bench_semantic_cache
+"""
+import random
+import statistics
+import tempfile
+import time
+
+from app.models import ItineraryRequest
+from app.services.semantic_cache import SemanticCache
+
+SIZES = [100, 1_000, 10_000, 50_000]
+QUERIES = 200
+BATCH = 1_000
+CITIES = ["chennai", "goa", "jaipur", "delhi", "mumbai", "kochi", "leh", "udaipur"]
+BUDGETS = ["budget", "mid-range", "luxury"]
+STYLES = ["fast-paced", "balanced", "relaxed"]
+
+
+def _random_unit_vectors(rng, count, dim):
+    vectors = []
+    for _ in range(count):
+        v = [rng.gauss(0, 1) for _ in range(dim)]
+        norm = sum(x * x for x in v) ** 0.5
+        vectors.append([x / norm for x in v])
+    return vectors
+
+
+def main():
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as path:
+        cache = SemanticCache(path=path, model_name="all-MiniLM-L6-v2", max_entries=max(SIZES))
+        if not cache._ensure():
+            print("semantic cache dependencies unavailable")
+            return
+
+        request = ItineraryRequest(destination="Chennai", duration=5, interests=["Sightseeing", "Food & Dining"],
+                                   budget="Mid-range", travel_style="Balanced")
+        samples = []
+        for _ in range(50):
+            start = time.perf_counter()
+            cache._embed(request)
+            samples.append((time.perf_counter() - start) * 1000)
+        print(f"embedding: median={statistics.median(samples):.2f}ms")
+
+        dim = len(cache._embed(request))
+        collection = cache._collection
+        size = 0
+        for target in SIZES:
+            while size < target:
+                n = min(BATCH, target - size)
+                collection.add(
+                    ids=[f"e{size + i}" for i in range(n)],
+                    embeddings=_random_unit_vectors(rng, n, dim),
+                    documents=["{}"] * n,
+                    metadatas=[{"destination": rng.choice(CITIES), "duration": rng.randrange(1, 15),
+                                "budget": rng.choice(BUDGETS), "travel_style": rng.choice(STYLES),
+                                "last_hit": time.time()} for _ in range(n)],
+                )
+                size += n
+
+            queries = _random_unit_vectors(rng, QUERIES, dim)
+            samples = []
+            for q in queries:
+                where = {"$and": [{"destination": rng.choice(CITIES)}, {"duration": rng.randrange(1, 15)},
+                                  {"budget": rng.choice(BUDGETS)}, {"travel_style": rng.choice(STYLES)}]}
+                start = time.perf_counter()
+                collection.query(query_embeddings=[q], n_results=1, where=where,
+                                 include=["documents", "distances", "metadatas"])
+                samples.append((time.perf_counter() - start) * 1000)
+            samples.sort()
+            print(f"{size:>7} entries: median={statistics.median(samples):6.2f}ms  "
+                  f"p95={samples[int(len(samples) * 0.95)]:6.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# backend/benchmarks/stub_upstream.py
+"""Local stand-ins for SerpAPI and SendGrid used by the benchmarks.
+
+Run it in-process with ``StubServer`` or standalone with
+``python -m benchmarks.stub_upstream`` and point ``SERPAPI_URL`` at
+``/search`` and ``SENDGRID_API_URL`` at ``/v3/mail/send``.
+"""
+import asyncio
+import os
+import random
+import socket
+import threading
+import time
+from typing import Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+AIRLINES = ["IndiGo", "Air India", "Vistara", "SpiceJet", "Akasa Air"]
+HOTEL_CHAINS = ["Taj", "Oberoi", "ITC", "Lemon Tree", "Ginger", "Treebo"]
+
+
+def flight_payload(departure_id: str, arrival_id: str, outbound_date: str,
+                   count: int = 10, seed: Optional[int] = None) -> dict:
+    """Build a google_flights response shaped like the real SerpAPI payload."""
+    rng = random.Random(seed if seed is not None else f"{departure_id}{arrival_id}{outbound_date}")
+    flights = []
+    for _ in range(count):
+        stops = rng.choice([0, 0, 1, 1, 2])
+        hour, minute = rng.randrange(0, 22), rng.choice([0, 15, 30, 45])
+        segments = []
+        total = 0
+        for i in range(stops + 1):
+            duration = rng.randrange(60, 240)
+            airline = rng.choice(AIRLINES)
+            dep = f"{outbound_date} {hour:02d}:{minute:02d}"
+            minutes = hour * 60 + minute + duration
+            hour, minute = (minutes // 60) % 24, minutes % 60
+            segments.append({
+                "departure_airport": {"name": f"{departure_id} Intl" if i == 0 else "Hub Airport",
+                                      "id": departure_id if i == 0 else "HUB", "time": dep},
+                "arrival_airport": {"name": f"{arrival_id} Intl" if i == stops else "Hub Airport",
+                                    "id": arrival_id if i == stops else "HUB",
+                                    "time": f"{outbound_date} {hour:02d}:{minute:02d}"},
+                "duration": duration,
+                "airplane": "Airbus A320",
+                "airline": airline,
+                "flight_number": f"{airline[:2].upper()} {rng.randrange(100, 9999)}",
+                "travel_class": "Economy",
+                "legroom": "29 in",
+            })
+            total += duration
+            if i < stops:
+                layover = rng.randrange(45, 180)
+                minutes = hour * 60 + minute + layover
+                hour, minute = (minutes // 60) % 24, minutes % 60
+                total += layover
+        flights.append({
+            "flights": segments,
+            "total_duration": total,
+            "price": rng.randrange(2500, 25000),
+            "type": "Round trip",
+            "travel_ads": [{"link": "https://example.com/book"}],
+        })
+    return {"best_flights": flights, "other_flights": []}
+
+
+def hotel_payload(location: str, page: int = 1, per_page: int = 20, pages: int = 5,
+                  seed: Optional[int] = None) -> dict:
+    """Build one page of a google_hotels response, with a next-page token
+    until ``pages`` pages have been served."""
+    rng = random.Random(seed if seed is not None else f"{location}{page}")
+    properties = []
+    for i in range(per_page):
+        stars = rng.randrange(1, 6)
+        properties.append({
+            "name": f"{rng.choice(HOTEL_CHAINS)} {location} {(page - 1) * per_page + i + 1}",
+            "rate_per_night": {"lowest": f"₹{rng.randrange(1500, 30000):,}"},
+            "overall_rating": round(rng.uniform(3.0, 5.0), 1),
+            "rating": round(rng.uniform(3.0, 5.0), 1),
+            "reviews": rng.randrange(10, 5000),
+            "hotel_class": f"{stars}-star hotel",
+            "extracted_hotel_class": stars,
+            "gps_coordinates": {"latitude": 13.08 + rng.uniform(-0.1, 0.1),
+                                "longitude": 80.27 + rng.uniform(-0.1, 0.1)},
+            "amenities": rng.sample(["Free Wi-Fi", "Pool", "Spa", "Gym", "Restaurant", "Bar", "Parking"], 4),
+            "images": [{"thumbnail": f"https://example.com/{location}/{page}/{i}.jpg"}],
+        })
+    payload = {"properties": properties}
+    if page < pages:
+        payload["serpapi_pagination"] = {"current_from": (page - 1) * per_page + 1,
+                                         "next_page_token": f"page-{page + 1}"}
+    return payload
+
+
+def create_app(latency_ms: Dict[str, float] = None, default_latency_ms: float = 200.0,
+               sendgrid_latency_ms: float = 100.0, sendgrid_failure_rate: float = 0.0) -> FastAPI:
+    """Stub app; search latency can be set per departure airport or hotel
+    query. The mail endpoint answers 503 for ``sendgrid_failure_rate`` of
+    requests, to exercise retries."""
+    latency_ms = latency_ms or {}
+    stub = FastAPI()
+    stub.state.calls = 0
+    stub.state.emails = []
+    stub.state.email_failures = 0
+
+    @stub.get("/search")
+    async def search(request: Request):
+        q = request.query_params
+        stub.state.calls += 1
+        if q.get("engine") == "google_hotels":
+            await asyncio.sleep(latency_ms.get(q.get("q", ""), default_latency_ms) / 1000)
+            page = int(q.get("next_page_token", "page-1").split("-")[1])
+            return hotel_payload(q.get("q", ""), page=page)
+        await asyncio.sleep(latency_ms.get(q.get("departure_id", ""), default_latency_ms) / 1000)
+        return flight_payload(q.get("departure_id", ""), q.get("arrival_id", ""), q.get("outbound_date", ""))
+
+    @stub.post("/v3/mail/send")
+    async def mail_send(request: Request):
+        body = await request.json()
+        await asyncio.sleep(sendgrid_latency_ms / 1000)
+        if random.random() < sendgrid_failure_rate:
+            stub.state.email_failures += 1
+            return Response(status_code=503)
+        stub.state.emails.append(body)
+        return Response(status_code=202)
+
+    return stub
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class StubServer:
+    """Run a stub app on a background thread for the duration of a ``with`` block."""
+
+    def __init__(self, app: FastAPI):
+        self.app = app
+        self.port = _free_port()
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join()
+
+
+if __name__ == "__main__":
+    uvicorn.run(create_app(), host="127.0.0.1", port=int(os.getenv("STUB_PORT", "8765")))
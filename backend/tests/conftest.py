@@ -0,0 +1,7 @@
+import os
+
+# Services read these at import; keep tests off the network and the disk
+os.environ.setdefault("SERPAPI_API_KEY", "test")
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ["DISK_CACHE_ENABLED"] = "0"
+os.environ["SEMANTIC_CACHE_ENABLED"] = "0"
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from app.outbox import Outbox
+from app.services import email_sender as email_sender_module
+from app.services.email_sender import EmailSender
+
+
+@pytest.fixture
+def outbox(tmp_path, monkeypatch):
+    box = Outbox(str(tmp_path / "outbox.sqlite3"))
+    monkeypatch.setattr(email_sender_module, "outbox", box)
+    yield box
+    box.close()
+
+
+def test_crashing_delivery_ends_up_failed(outbox):
+    sender = EmailSender(max_attempts=3, backoff_base=0)
+    calls = []
+
+    async def crash(message):
+        calls.append(message["attempts"])
+        raise ValueError("bad payload")
+
+    sender._deliver = crash
+    message_id = outbox.add("a@example.com", {"subject": "Trip"})
+
+    async def drain():
+        while (message := outbox.claim(sender.lease, sender.max_attempts)) is not None:
+            await sender._process(message)
+
+    asyncio.run(drain())
+
+    assert calls == [1, 2, 3]
+    row = outbox.get(message_id)
+    assert row["status"] == "failed" and "bad payload" in row["last_error"]
+    assert sender.stats()["in_flight"] == 0
+
+
+def test_lease_lost_on_last_attempt_fails_message(outbox):
+    message_id = outbox.add("a@example.com", {"subject": "Trip"})
+    # The sender dies mid-send every time, so each lease just runs out
+    for attempt in (1, 2):
+        assert outbox.claim(0, 2)["attempts"] == attempt
+
+    assert outbox.claim(0, 2) is None
+    row = outbox.get(message_id)
+    assert row["status"] == "failed" and row["attempts"] == 2
+
+
+def test_purge_keeps_pending_and_recent_messages(outbox):
+    sender = EmailSender(retention=60)
+    old_sent, old_failed, old_queued, recent_sent = (
+        outbox.add(f"{name}@example.com", {}) for name in ("a", "b", "c", "d"))
+    for message_id in (old_sent, recent_sent):
+        outbox.mark_sent(message_id)
+    outbox.mark_failed(old_failed, "rejected")
+    # Everything so far finished two minutes ago, except the recent send
+    now = email_sender_module.time.time()
+    with outbox._lock:
+        outbox._connect().execute("UPDATE outbox SET updated_at = ? WHERE id != ?", (now - 120, recent_sent))
+
+    assert asyncio.run(sender.purge()) == 2
+
+    assert outbox.get(old_sent) is None and outbox.get(old_failed) is None
+    assert outbox.get(old_queued)["status"] == "queued"
+    assert outbox.get(recent_sent)["status"] == "sent"
+    assert sender.stats()["purged"] == 2
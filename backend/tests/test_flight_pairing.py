@@ -0,0 +1,100 @@
+import itertools
+import math
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.flight_pairing import k_best_pairs
+from app.services.flight_results import FlightResultSet
+
+START = datetime(2026, 12, 1)
+
+
+def _option(rng, day_offset):
+    departs = START + timedelta(days=day_offset, minutes=rng.randrange(0, 24 * 60, 30))
+    duration = rng.randrange(60, 600, 15)
+    segment = {"airline": "Air", "departure_time": departs.strftime("%Y-%m-%d %H:%M"),
+               "arrival_time": (departs + timedelta(minutes=duration)).strftime("%Y-%m-%d %H:%M")}
+    if rng.random() < 0.1:
+        segment["arrival_time" if day_offset == 0 else "departure_time"] = None
+    return {
+        "total_price": "₹N/A" if rng.random() < 0.1 else f"₹{rng.randrange(2000, 9000, 250)}",
+        "total_duration": duration,
+        "stops": rng.randrange(0, 3),
+        "segments": [segment],
+    }
+
+
+def _legs(seed):
+    rng = random.Random(seed)
+    # Returns fly out 0-2 days after the outbound day, so some stays are negative
+    outbound = FlightResultSet([_option(rng, 0) for _ in range(12)])
+    inbound = FlightResultSet([_option(rng, rng.randrange(0, 3)) for _ in range(12)])
+    return outbound, inbound
+
+
+def _brute_force(outbound, inbound, sort, max_total_price, max_stops, min_layover_minutes):
+    found = []
+    for i, j in itertools.product(range(len(outbound.options)), range(len(inbound.options))):
+        price = outbound.price[i] + inbound.price[j]
+        if math.isnan(price):
+            continue
+        if max_stops is not None and (outbound.stops[i] > max_stops or inbound.stops[j] > max_stops):
+            continue
+        stay = inbound.departs_at[j] - outbound.arrives_at[i]
+        if math.isnan(stay):
+            if min_layover_minutes is not None:
+                continue
+        elif stay < (min_layover_minutes or 0):
+            continue
+        if max_total_price is not None and price > max_total_price:
+            continue
+        cost = price if sort == "price" else int(outbound.duration[i]) + int(inbound.duration[j])
+        found.append((cost, i, j, price, None if math.isnan(stay) else stay))
+    return sorted(found)
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("sort, k, max_total_price, max_stops, min_layover_minutes", [
+    ("price", 10, None, None, None),
+    ("duration", 10, None, None, None),
+    ("price", 8, 9000, None, None),
+    ("price", 8, None, 1, None),
+    ("duration", 8, None, 0, 120),
+    ("price", 8, None, None, 24 * 60),
+    # More than can be found: every feasible pair, and nothing else
+    ("price", 1000, None, None, None),
+    ("duration", 1000, 11000, 1, 60),
+])
+def test_k_best_pairs_matches_brute_force(seed, sort, k, max_total_price, max_stops, min_layover_minutes):
+    outbound, inbound = _legs(seed)
+
+    pairs = k_best_pairs(outbound, inbound, k=k, sort=sort, max_total_price=max_total_price,
+                         max_stops=max_stops, min_layover_minutes=min_layover_minutes)
+    expected = _brute_force(outbound, inbound, sort, max_total_price, max_stops, min_layover_minutes)
+
+    assert len(pairs) == min(k, len(expected))
+    by_pair = {(i, j): (cost, price, stay) for cost, i, j, price, stay in expected}
+    costs = []
+    for i, j, total_price, stay in pairs:
+        assert (i, j) in by_pair
+        cost, price, expected_stay = by_pair[(i, j)]
+        assert total_price == price and stay == expected_stay
+        costs.append(cost)
+    # Ties may come out in any order, so compare the costs rather than the pairs
+    assert costs == [cost for cost, *_ in expected[:k]]
+
+
+def test_negative_stay_is_rejected_without_a_minimum():
+    outbound = FlightResultSet([{"total_price": "₹1000", "total_duration": 60, "segments": [
+        {"departure_time": "2026-12-05 08:00", "arrival_time": "2026-12-05 09:00"}]}])
+    inbound = FlightResultSet([
+        # Leaves before the outbound lands
+        {"total_price": "₹500", "total_duration": 60, "segments": [
+            {"departure_time": "2026-12-04 10:00", "arrival_time": "2026-12-04 11:00"}]},
+        {"total_price": "₹900", "total_duration": 60, "segments": [
+            {"departure_time": "2026-12-08 10:00", "arrival_time": "2026-12-08 11:00"}]},
+    ])
+
+    assert k_best_pairs(outbound, inbound) == [(0, 1, 1900.0, 3 * 24 * 60 + 60)]
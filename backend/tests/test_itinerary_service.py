@@ -0,0 +1,99 @@
+from app.models import GeneratedItinerary, ItineraryRequest
+from app.services.itinerary_service import _chunk_prompt, day_ranges, merge_chunks, outline_days, use_chunked
+
+
+def _request(duration=4):
+    return ItineraryRequest(destination="Kochi", duration=duration, interests=["Food"], budget="Budget",
+                            travel_style="Balanced", chunked=True)
+
+
+def _plan(day, highlights, activities):
+    return {
+        "day": day,
+        "date": f"Day {day}",
+        "time_slots": {"morning": {"time": "9:00 AM - 12:00 PM", "activities": activities}},
+        "highlights": highlights,
+    }
+
+
+def test_outline_days_skips_malformed_entries():
+    outline = {"days": [
+        {"day": "2", "theme": "Forts", "attractions": ["Fort Kochi", 7]},
+        {"day": "two", "theme": "Beaches"},
+        "Day 3: markets",
+        {"day": 4, "theme": None},
+    ]}
+
+    days = outline_days(outline)
+
+    assert days == [
+        {"day": 2, "theme": "Forts", "attractions": ["Fort Kochi"]},
+        {"day": 4, "theme": "", "attractions": []},
+    ]
+    assert "Day 2: Forts - Fort Kochi" in _chunk_prompt(_request(), days, 1, 2)
+    assert outline_days({"days": "none"}) == [] and outline_days(["not", "an", "object"]) == []
+
+
+def test_merge_chunks_skips_malformed_entries():
+    chunks = [
+        {"daily_plans": [_plan("1", ["Beach", 3], ["Swim", None]), "Day 2", _plan(9, [], [])]},
+        ["not", "an", "object"],
+        {"daily_plans": {"day": 3}},
+    ]
+
+    merged = merge_chunks(_request(), {"summary": "s", "packing_list": ["Hat", 1]}, chunks)
+
+    assert [p["day"] for p in merged["daily_plans"]] == [1]
+    plan = merged["daily_plans"][0]
+    assert plan["highlights"] == ["Beach"]
+    assert plan["time_slots"]["morning"]["activities"] == ["Swim"]
+    assert merged["packing_list"] == ["Hat"] and merged["local_tips"] == []
+    GeneratedItinerary.model_validate(merged)
+
+
+def test_merge_chunks_orders_days_and_drops_repeated_highlights():
+    chunks = [
+        {"daily_plans": [
+            _plan(3, ["Spice Market", "fort  kochi"], ["Spice market", "Dinner near Fort Kochi beach"]),
+            _plan(4, ["Backwaters"], ["Houseboat"]),
+        ]},
+        {"daily_plans": [
+            _plan(1, ["Fort Kochi!", "Market"], ["Walk the Market", "Ferry"]),
+            _plan(2, ["Spice Market"], ["Spice Market", "Market"]),
+            # A later copy of a day is ignored
+            _plan(1, ["Elsewhere"], ["Elsewhere"]),
+        ]},
+    ]
+
+    merged = merge_chunks(_request(), {"summary": "s"}, chunks)
+
+    assert [p["day"] for p in merged["daily_plans"]] == [1, 2, 3, 4]
+    assert [p["highlights"] for p in merged["daily_plans"]] == [
+        ["Fort Kochi!", "Market"], ["Spice Market"], [], ["Backwaters"]]
+    activities = [p["time_slots"]["morning"]["activities"] for p in merged["daily_plans"]]
+    # Only activities that are an earlier highlight go; mentioning one is fine
+    assert activities == [
+        ["Walk the Market", "Ferry"],
+        ["Spice Market"],
+        ["Dinner near Fort Kochi beach"],
+        ["Houseboat"],
+    ]
+
+
+def test_chunking_is_opt_in(monkeypatch):
+    monkeypatch.delenv("CHUNKED_MIN_DAYS", raising=False)
+    long_trip = _request(duration=10).model_copy(update={"chunked": None})
+
+    assert not use_chunked(long_trip)
+    assert use_chunked(long_trip.model_copy(update={"chunked": True}))
+    monkeypatch.setenv("CHUNKED_MIN_DAYS", "6")
+    assert use_chunked(long_trip)
+    assert not use_chunked(long_trip.model_copy(update={"chunked": False}))
+    assert not use_chunked(_request(duration=5).model_copy(update={"chunked": None}))
+
+
+def test_day_ranges_cover_every_day_once(monkeypatch):
+    monkeypatch.setenv("CHUNK_DAYS", "3")
+
+    assert day_ranges(_request(duration=7)) == [(1, 3), (4, 6), (7, 7)]
+    assert day_ranges(_request(duration=3)) == [(1, 3)]
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.models import ItineraryRequest
+from app.services import itinerary_stream
+from app.services.itinerary_service import PREFERRED_MODELS
+from app.services.model_dispatcher import CircuitBreaker, model_dispatcher
+from app.services.model_registry import model_registry
+
+DAY = {
+    "day": 1,
+    "date": "Day 1",
+    "time_slots": {"morning": {"time": "9:00 AM - 12:00 PM", "activities": ["Beach"]}},
+    "highlights": ["Beach"],
+}
+
+
+class FakeStream:
+    def __init__(self, text):
+        self.chunks = [text[i:i + 20] for i in range(0, len(text), 20)]
+        self.closed = False
+
+    def __iter__(self):
+        for piece in self.chunks:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClient:
+    def __init__(self, text):
+        self.streams = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self.text = text
+
+    def _create(self, **kwargs):
+        self.streams.append(FakeStream(self.text))
+        return self.streams[-1]
+
+
+@pytest.fixture
+def fake_client():
+    reply = json.dumps({"daily_plans": [DAY, dict(DAY, day=2, date="Day 2")], "summary": "s",
+                        "packing_list": [], "local_tips": []})
+    client = FakeClient(reply)
+    previous = model_registry._client
+    model_registry.configure(client)
+    yield client
+    model_registry.configure(previous)
+
+
+def _request():
+    return ItineraryRequest(destination="Goa", duration=2, interests=["Food"], budget="Budget",
+                            travel_style="Balanced", chunked=False)
+
+
+def _half_open(model):
+    breaker = model_dispatcher.breaker(model)
+    breaker.state, breaker.failures, breaker._probing = "open", breaker.failure_threshold, False
+    breaker.opened_at = time.monotonic() - breaker.cooldown - 1
+    return breaker
+
+
+def test_disconnect_releases_half_open_probe(fake_client):
+    model = model_registry.ranked(PREFERRED_MODELS)[0]
+    breaker = _half_open(model)
+
+    events = itinerary_stream.stream_itinerary_service(_request())
+    assert json.loads(next(events))["type"] == "day"
+    assert breaker.state == "half_open" and not breaker.allow()
+    # The client goes away mid-stream
+    events.close()
+
+    assert fake_client.streams[-1].closed
+    assert breaker.allow()
+    breaker.on_success()
+
+
+def test_finished_stream_closes_breaker(fake_client):
+    model = model_registry.ranked(PREFERRED_MODELS)[0]
+    breaker = _half_open(model)
+
+    kinds = [json.loads(e)["type"] for e in itinerary_stream.stream_itinerary_service(_request())]
+
+    assert kinds == ["day", "day", "summary", "packing_list", "local_tips", "done"]
+    assert breaker.state == "closed"
+
+
+def test_lost_probe_times_out():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=0, probe_timeout=0.05)
+    breaker.on_failure()
+    assert breaker.allow()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+
+
+def test_chunked_stream_sends_days_before_the_slowest_chunk(monkeypatch):
+    monkeypatch.setenv("CHUNK_DAYS", "2")
+    landed = []
+
+    async def fake_complete_json(prompt):
+        if prompt.startswith("Outline"):
+            return {"summary": "s", "days": [], "packing_list": [], "local_tips": []}
+        first = int(prompt.split("Write days ")[1].split(" ")[0])
+        # The last range is the slowest
+        await asyncio.sleep(0.01 if first == 1 else 0.05)
+        landed.append(first)
+        return {"daily_plans": [dict(DAY, day=d, date=f"Day {d}", highlights=[f"Sight {d}"])
+                                for d in (first, first + 1)]}
+
+    monkeypatch.setattr(itinerary_stream, "complete_json", fake_complete_json)
+    request = ItineraryRequest(destination="Goa", duration=4, interests=["Food"], budget="Budget",
+                               travel_style="Balanced", chunked=True)
+
+    async def collect():
+        events = []
+        async for event in itinerary_stream.stream_chunked_itinerary(request):
+            events.append((json.loads(event), list(landed)))
+        return events
+
+    events = asyncio.run(collect())
+
+    assert [e["type"] for e, _ in events] == ["day"] * 4 + ["summary", "packing_list", "local_tips", "done"]
+    assert [e["data"]["day"] for e, _ in events[:4]] == [1, 2, 3, 4]
+    # Days 1 and 2 went out before the second range landed
+    assert events[0][1] == events[1][1] == [1]
+
+
+def test_no_preferred_model_available_is_reported(fake_client, monkeypatch):
+    monkeypatch.setattr(model_registry, "available", ["some-other-model"])
+
+    with pytest.raises(Exception, match="none of the preferred models"):
+        asyncio.run(model_dispatcher.complete_json("{}", PREFERRED_MODELS))
+    events = [json.loads(e) for e in itinerary_stream.stream_itinerary_service(_request())]
+
+    assert events[-1]["type"] == "error" and "none of the preferred models" in events[-1]["data"]
+    assert not fake_client.streams
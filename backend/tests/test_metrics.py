@@ -0,0 +1,23 @@
+import asyncio
+import threading
+
+from app.services import metrics_service
+
+
+def test_outbox_counts_are_read_off_the_event_loop(monkeypatch):
+    threads = []
+
+    def stats():
+        threads.append(threading.get_ident())
+        return {"queued": 3, "sending": 0, "sent": 7, "failed": 1}
+
+    monkeypatch.setattr(metrics_service.outbox, "stats", stats)
+
+    async def scrape():
+        return threading.get_ident(), await metrics_service.metrics_service()
+
+    loop_thread, text = asyncio.run(scrape())
+
+    assert threads and threads[0] != loop_thread
+    assert 'email_outbox_messages{status="queued"} 3' in text
+    assert 'email_outbox_messages{status="sent"} 7' in text
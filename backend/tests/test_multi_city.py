@@ -0,0 +1,98 @@
+import itertools
+import math
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.flight_results import FlightResultSet
+from app.services.multi_city_service import best_itineraries
+
+START = datetime(2026, 12, 1)
+
+
+def _leg(rng, day, count=6):
+    options = []
+    for _ in range(count):
+        departs = START + timedelta(days=day, minutes=rng.randrange(-12 * 60, 36 * 60, 30))
+        duration = rng.randrange(60, 480, 15)
+        segment = {"departure_time": departs.strftime("%Y-%m-%d %H:%M"),
+                   "arrival_time": (departs + timedelta(minutes=duration)).strftime("%Y-%m-%d %H:%M")}
+        if rng.random() < 0.1:
+            segment["departure_time"] = None
+        options.append({
+            "total_price": "₹N/A" if rng.random() < 0.1 else f"₹{rng.randrange(1500, 8000, 250)}",
+            "total_duration": duration,
+            "segments": [segment],
+        })
+    return FlightResultSet(options)
+
+
+def _legs(seed):
+    rng = random.Random(seed)
+    # A day apart, with departures spread so some connections overlap
+    return [_leg(rng, day) for day in range(3)]
+
+
+def _brute_force(legs, sort, max_total_price, max_total_duration, min_connection_minutes):
+    found = []
+    for indices in itertools.product(*(range(len(leg.options)) for leg in legs)):
+        price = sum(leg.price[i] for leg, i in zip(legs, indices))
+        duration = sum(int(leg.duration[i]) for leg, i in zip(legs, indices))
+        if math.isnan(price):
+            continue
+        gaps = [legs[n].departs_at[indices[n]] - legs[n - 1].arrives_at[indices[n - 1]] for n in range(1, len(legs))]
+        if any(not math.isnan(gap) and gap < min_connection_minutes for gap in gaps):
+            continue
+        if max_total_price is not None and price > max_total_price:
+            continue
+        if max_total_duration is not None and duration > max_total_duration:
+            continue
+        found.append((price if sort == "price" else duration, price, duration, list(indices)))
+    return sorted(found, key=lambda itinerary: itinerary[0])
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("sort, top_n, max_total_price, max_total_duration, min_connection_minutes", [
+    ("price", 5, None, None, 0),
+    ("duration", 5, None, None, 0),
+    ("price", 5, 12000, None, 0),
+    ("price", 5, None, 900, 0),
+    ("duration", 5, 14000, None, 120),
+    ("price", 5, None, None, 6 * 60),
+    # More than can be found: every feasible itinerary, and nothing else
+    ("price", 1000, None, None, 0),
+    ("duration", 1000, 15000, 1000, 60),
+])
+def test_best_itineraries_matches_brute_force(seed, sort, top_n, max_total_price, max_total_duration,
+                                              min_connection_minutes):
+    legs = _legs(seed)
+
+    found = best_itineraries(legs, sort=sort, top_n=top_n, max_total_price=max_total_price,
+                             max_total_duration=max_total_duration,
+                             min_connection_minutes=min_connection_minutes)
+    expected = _brute_force(legs, sort, max_total_price, max_total_duration, min_connection_minutes)
+
+    assert len(found) == min(top_n, len(expected))
+    by_indices = {tuple(indices): (cost, price, duration) for cost, price, duration, indices in expected}
+    for cost, price, duration, indices in found:
+        assert by_indices[tuple(indices)] == (cost, price, duration)
+    # Ties may come out in any order, so compare the costs rather than the itineraries
+    assert [cost for cost, *_ in found] == [cost for cost, *_ in expected[:top_n]]
+
+
+def test_overlapping_connection_is_rejected():
+    def leg(*times):
+        return FlightResultSet([
+            {"total_price": f"₹{price}", "total_duration": 60,
+             "segments": [{"departure_time": departs, "arrival_time": arrives}]}
+            for price, departs, arrives in times
+        ])
+
+    legs = [
+        leg((1000, "2026-12-01 08:00", "2026-12-01 10:00")),
+        # The cheaper second leg departs before the first one lands
+        leg((500, "2026-12-01 09:00", "2026-12-01 11:00"), (900, "2026-12-01 12:00", "2026-12-01 13:00")),
+    ]
+
+    assert best_itineraries(legs) == [(1900.0, 1900.0, 120.0, [0, 1])]
@@ -0,0 +1,30 @@
+import asyncio
+import time
+
+from app.cache import ResponseCache
+from app.disk_cache import DiskCache
+from app.services import serpapi_client
+
+PARAMS = {"engine": "google_flights", "departure_id": "DEL", "arrival_id": "MAA"}
+
+
+def test_disk_hit_keeps_its_remaining_lifetime_in_memory(tmp_path, monkeypatch):
+    disk = DiskCache(str(tmp_path / "cache.sqlite3"))
+    memory = ResponseCache()
+    monkeypatch.setattr(serpapi_client, "disk_cache", disk)
+    monkeypatch.setattr(serpapi_client, "response_cache", memory)
+
+    async def upstream(params):
+        raise AssertionError("a disk hit must not go upstream")
+
+    monkeypatch.setattr(serpapi_client, "_fetch", upstream)
+    key = serpapi_client.cache_key(PARAMS)
+    # Written by another worker and almost expired
+    disk.set(key, ({"best_flights": []}, 10), ttl=5)
+
+    payload = asyncio.run(serpapi_client.search(PARAMS))
+
+    assert payload == {"best_flights": []}
+    assert serpapi_client.cache_ttl("google_flights") > 5
+    assert memory._entries[key].expires_at - time.monotonic() <= 5
+    disk.close()
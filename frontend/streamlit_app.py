@@ -8,6 +8,8 @@ from datetime import date, timedelta
 # Config
 FASTAPI_URL = os.getenv("FASTAPI_URL", "http://127.0.0.1:8000")
 MIN_DATE = date.today()
+PAGE_SIZE = 10
+HOTEL_PAGES = 3
 
 # Session State
 if "selected_flight" not in st.session_state:
@@ -16,11 +18,82 @@ if "selected_hotel" not in st.session_state:
     st.session_state.selected_hotel = None
 if "flights" not in st.session_state:
     st.session_state.flights = {"outbound": [], "return": []}
+if "search_id" not in st.session_state:
+    st.session_state.search_id = None
 if "hotels" not in st.session_state:
     st.session_state.hotels = []
+if "hotel_search_id" not in st.session_state:
+    st.session_state.hotel_search_id = None
 if "itinerary" not in st.session_state:
     st.session_state.itinerary = None
 
+def flight_results_page(leg):
+    """Sorted, filtered page of a leg from the backend's stored results.
+
+    Falls back to the full list from the search response if the backend
+    can't serve pages for this search.
+    """
+    options = st.session_state.flights[leg]
+    if not st.session_state.search_id:
+        return options
+
+    col_sort, col_stops, col_before, col_page = st.columns(4)
+    with col_sort:
+        sort = st.selectbox("Sort by", ["price", "duration", "departure", "stops"], key=f"{leg}_sort")
+    with col_stops:
+        stops = st.selectbox("Stops", ["Any", "Nonstop", "Up to 1 stop"], key=f"{leg}_stops")
+    with col_before:
+        depart_before = st.slider("Departs before (hour)", 1, 24, 24, key=f"{leg}_before")
+    with col_page:
+        page = st.number_input("Page", min_value=1, value=1, key=f"{leg}_page")
+
+    params = {"leg": leg, "sort": sort, "page": page, "page_size": PAGE_SIZE}
+    if stops != "Any":
+        params["max_stops"] = 0 if stops == "Nonstop" else 1
+    if depart_before < 24:
+        params["depart_before"] = depart_before
+    try:
+        res = requests.get(f"{FASTAPI_URL}/search_flights/{st.session_state.search_id}/results", params=params)
+        if res.status_code == 200:
+            data = res.json()
+            st.caption(f"{data['total']} matching flights · page {data['page']} of {max(data['pages'], 1)}")
+            return data["results"]
+    except Exception as e:
+        st.warning(f"Showing unsorted results: {str(e)}")
+    return options
+
+def ranked_hotels():
+    """Hotels reordered by the backend using the weights picked here.
+
+    Re-ranking reuses the stored search, so moving a slider costs no new
+    hotel search.
+    """
+    hotels = st.session_state.hotels
+    if not st.session_state.hotel_search_id:
+        return hotels
+
+    col_price, col_rating, col_stars = st.columns(3)
+    with col_price:
+        price_weight = st.slider("Low price", 0.0, 1.0, 1.0, 0.1, key="rank_price")
+    with col_rating:
+        rating_weight = st.slider("Guest rating", 0.0, 1.0, 1.0, 0.1, key="rank_rating")
+    with col_stars:
+        stars_weight = st.slider("Star class", 0.0, 1.0, 0.5, 0.1, key="rank_stars")
+
+    weights = {
+        "price_weight": price_weight,
+        "rating_weight": rating_weight,
+        "stars_weight": stars_weight,
+        "k": min(len(hotels), 100)
+    }
+    try:
+        res = requests.post(f"{FASTAPI_URL}/search_hotels/{st.session_state.hotel_search_id}/rank", json=weights)
+        if res.status_code == 200:
+            return res.json()["results"]
+    except Exception as e:
+        st.warning(f"Showing unranked hotels: {str(e)}")
+    return hotels
+
 # UI Setup
 st.set_page_config(page_title="Travel Planner Pro", page_icon="✈️", layout="wide")
 st.title("✈️ AI Travel Planner Pro")
@@ -63,6 +136,7 @@ with st.form("flight_form"):
                 res = requests.post(f"{FASTAPI_URL}/search_flights", json=payload)
                 if res.status_code == 200:
                     st.session_state.flights = res.json()
+                    st.session_state.search_id = res.headers.get("X-Search-Id")
                     st.success(f"Found {len(st.session_state.flights['outbound'])} outbound options" + 
                               (f" and {len(st.session_state.flights['return'])} return options" if search_return else ""))
                 else:
@@ -70,10 +144,94 @@ with st.form("flight_form"):
             except Exception as e:
                 st.error(f"Error: {str(e)}")
 
+# Quick plan: flights, hotels and an itinerary in one request
+if st.button("⚡ Plan Whole Trip", help="Search flights and hotels and draft an itinerary at the same time"):
+    payload = {
+        "origin": origin,
+        "destination": destination,
+        "outbound_date": outbound_date.strftime("%Y-%m-%d"),
+        "return_date": return_date.strftime("%Y-%m-%d"),
+        "cabin_class": cabin_class,
+        "nonstop": nonstop
+    }
+    with st.status("Planning your trip...", expanded=True) as status:
+        try:
+            res = requests.post(f"{FASTAPI_URL}/plan_trip", json=payload, stream=True)
+            if res.status_code == 200:
+                for line in res.iter_lines():
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    if event["type"] == "flights":
+                        flights = event["data"]
+                        st.session_state.search_id = flights.pop("search_id")
+                        st.session_state.flights = flights
+                        if flights["outbound"]:
+                            st.session_state.selected_flight["outbound"] = flights["outbound"][0]
+                        st.write(f"✈️ {len(flights['outbound'])} flights found")
+                    elif event["type"] == "hotels":
+                        st.session_state.hotel_search_id = event["data"]["search_id"]
+                        st.session_state.hotels = event["data"]["hotels"]
+                        if st.session_state.hotels:
+                            st.session_state.selected_hotel = st.session_state.hotels[0]
+                        st.write(f"🏨 {len(st.session_state.hotels)} hotels found")
+                    elif event["type"] == "itinerary":
+                        st.session_state.itinerary = event["data"]
+                        st.write("🗺️ Itinerary drafted")
+                    elif event["type"] == "error":
+                        st.error(f"{event['data']['part'].title()}: {event['data']['detail']}")
+                status.update(label="Trip planned!", state="complete")
+            else:
+                st.error(res.json().get("detail", "Trip planning failed"))
+                status.update(state="error")
+        except Exception as e:
+            st.error(f"Error: {str(e)}")
+            status.update(state="error")
+
+# Flexible dates: cheapest fare for nearby outbound/return dates
+with st.expander("📅 Flexible dates (±3 days)"):
+    if st.button("Show Fare Calendar"):
+        payload = {
+            "origin": origin,
+            "destination": destination,
+            "outbound_date": outbound_date.strftime("%Y-%m-%d"),
+            "return_date": return_date.strftime("%Y-%m-%d"),
+            "cabin_class": cabin_class,
+            "nonstop": nonstop
+        }
+        try:
+            res = requests.post(f"{FASTAPI_URL}/fare_calendar", json=payload, stream=True)
+            if res.status_code == 200:
+                table = st.empty()
+                grid, return_dates = {}, []
+                for line in res.iter_lines():
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    if event["type"] == "dates":
+                        return_dates = event["data"]["return_dates"]
+                    elif event["type"] == "row":
+                        grid[event["data"]["outbound_date"]] = event["data"]["prices"]
+                        table.dataframe({
+                            "Departure": list(grid),
+                            **{r: [row[j] for row in grid.values()] for j, r in enumerate(return_dates)}
+                        })
+                    elif event["type"] == "summary":
+                        cheapest = event["data"]["cheapest"]
+                        if cheapest:
+                            st.success(f"Cheapest: ₹{cheapest['price']:,.0f} departing {cheapest['outbound_date']}, "
+                                       f"returning {cheapest['return_date']}")
+                        else:
+                            st.warning("No fares found for these dates")
+            else:
+                st.error(res.json().get("detail", "Fare calendar failed"))
+        except Exception as e:
+            st.error(f"Error: {str(e)}")
+
 # Display Outbound Flights
 if st.session_state.flights["outbound"]:
     st.subheader("Outbound Flights")
-    for i, flight in enumerate(st.session_state.flights["outbound"]):
+    for i, flight in enumerate(flight_results_page("outbound")):
         with st.expander(
             f"✈️ Flight {i+1} | {flight['total_price']} | "
             f"{flight['total_duration']//60}h {flight['total_duration']%60}m | "
@@ -120,7 +278,7 @@ if st.session_state.flights["outbound"]:
 # Display Return Flights if searched
 if search_return and st.session_state.flights["return"]:
     st.subheader("Return Flights")
-    for i, flight in enumerate(st.session_state.flights["return"]):
+    for i, flight in enumerate(flight_results_page("return")):
         with st.expander(
             f"✈️ Flight {i+1} | {flight['total_price']} | "
             f"{flight['total_duration']//60}h {flight['total_duration']%60}m | "
@@ -164,6 +322,34 @@ if search_return and st.session_state.flights["return"]:
                 st.session_state.selected_flight["return"] = flight
                 st.success("Return flight selected!")
 
+# Best outbound + return combinations, paired by the backend
+if search_return and st.session_state.flights["return"] and st.session_state.search_id:
+    st.subheader("Best Combinations")
+    col_pair_sort, col_stay = st.columns(2)
+    with col_pair_sort:
+        pair_sort = st.selectbox("Optimize for", ["price", "duration"], key="pair_sort")
+    with col_stay:
+        min_stay = st.number_input("Minimum hours at destination", min_value=0, value=0, key="pair_stay")
+    params = {"sort": pair_sort, "k": 5}
+    if min_stay:
+        params["min_layover_minutes"] = min_stay * 60
+    try:
+        res = requests.get(f"{FASTAPI_URL}/search_flights/{st.session_state.search_id}/pairs", params=params)
+        if res.status_code == 200:
+            for i, pair in enumerate(res.json()["pairs"]):
+                col_pair, col_pick = st.columns([4, 1])
+                with col_pair:
+                    st.markdown(
+                        f"**₹{pair['total_price']:,.0f}** · {pair['total_duration']//60}h {pair['total_duration']%60}m flying · "
+                        f"{pair['outbound']['segments'][0]['airline']} out, {pair['return']['segments'][0]['airline']} back"
+                    )
+                with col_pick:
+                    if st.button("Select", key=f"pair_{i}"):
+                        st.session_state.selected_flight = {"outbound": pair["outbound"], "return": pair["return"]}
+                        st.success("Flights selected!")
+    except Exception as e:
+        st.warning(f"Couldn't pair flights: {str(e)}")
+
 # Hotel Search Section
 if st.session_state.selected_flight["outbound"]:
     st.header("Step 2: Find Hotels")
@@ -186,9 +372,29 @@ if st.session_state.selected_flight["outbound"]:
             }
             with st.spinner("Finding hotels..."):
                 try:
-                    res = requests.post(f"{FASTAPI_URL}/search_hotels", json=payload)
+                    # Pages arrive one at a time; list them while the rest load
+                    res = requests.post(f"{FASTAPI_URL}/search_hotels/stream", json=payload,
+                                        params={"max_pages": HOTEL_PAGES}, stream=True)
                     if res.status_code == 200:
-                        st.session_state.hotels = res.json().get("hotels", [])
+                        hotels = []
+                        preview = st.empty()
+                        for line in res.iter_lines():
+                            if not line:
+                                continue
+                            event = json.loads(line)
+                            if event["type"] == "page":
+                                hotels.extend(event["data"]["hotels"])
+                                with preview.container():
+                                    st.caption(f"{len(hotels)} hotels so far...")
+                                    preview_cols = st.columns(2)
+                                    for i, hotel in enumerate(hotels):
+                                        preview_cols[i % 2].markdown(f"🏨 **{hotel['name']}** — ₹{hotel['price']}/night")
+                            elif event["type"] == "done":
+                                st.session_state.hotel_search_id = event["data"]["search_id"]
+                            elif event["type"] == "error":
+                                st.error(event["data"])
+                        preview.empty()
+                        st.session_state.hotels = hotels
                         st.success(f"Found {len(st.session_state.hotels)} hotels!")
                     else:
                         st.error(res.json().get("detail", "Hotel search failed"))
@@ -198,8 +404,9 @@ if st.session_state.selected_flight["outbound"]:
 # Display Hotels
 if st.session_state.hotels:
     st.subheader("Available Hotels")
+    hotels = ranked_hotels()
     cols = st.columns(2)
-    for i, hotel in enumerate(st.session_state.hotels):
+    for i, hotel in enumerate(hotels):
         with cols[i % 2].container(border=True):
             stars = hotel.get('stars', 0)
             st.markdown(f"### 🏨 {hotel['name']} {'⭐' * stars if stars > 0 else ''}")
@@ -282,10 +489,31 @@ if st.session_state.selected_flight["outbound"] and st.session_state.selected_ho
                 
                 with st.spinner("🧠 Creating your personalized itinerary..."):
                     try:
-                        res = requests.post(f"{FASTAPI_URL}/generate_itinerary", json=payload)
+                        # Stream days in as the model writes them
+                        res = requests.post(f"{FASTAPI_URL}/generate_itinerary/stream", json=payload, stream=True)
                         if res.status_code == 200:
-                            st.session_state.itinerary = res.json()
-                            st.success("Itinerary generated!")
+                            streamed = {"destination": destination, "daily_plans": []}
+                            preview = st.empty()
+                            failed = False
+                            for line in res.iter_lines():
+                                if not line:
+                                    continue
+                                event = json.loads(line)
+                                if event["type"] == "day":
+                                    streamed["daily_plans"].append(event["data"])
+                                    with preview.container():
+                                        for day in streamed["daily_plans"]:
+                                            st.markdown(f"**Day {day['day']}: {day.get('date', '')}** — "
+                                                        + ", ".join(day.get("highlights", [])))
+                                elif event["type"] in ("summary", "packing_list", "local_tips"):
+                                    streamed[event["type"]] = event["data"]
+                                elif event["type"] == "error":
+                                    st.error(event["data"])
+                                    failed = True
+                            preview.empty()
+                            if not failed:
+                                st.session_state.itinerary = streamed
+                                st.success("Itinerary generated!")
                         else:
                             st.error(res.json().get("detail", "Itinerary generation failed"))
                     except Exception as e:
@@ -373,7 +601,7 @@ if st.session_state.selected_flight["outbound"] and st.session_state.selected_ho
         # Email Itinerary Section
         with st.expander("📧 Email This Itinerary", expanded=False):
             with st.form("email_form"):
-                email = st.text_input("Enter your email address")
+                email = st.text_input("Enter email addresses (separate several with commas)")
                 customize = st.checkbox("Add personal message", False)
                 message = ""
                 
@@ -393,17 +621,31 @@ if st.session_state.selected_flight["outbound"] and st.session_state.selected_ho
                                 f"at {arrival_flight['arrival_airport']}"
                             )
                         
-                        payload = {
-                            "email": email,
-                            "itinerary": itinerary_data,
-                            "personal_message": message
-                        }
+                        addresses = [a.strip() for a in email.split(",") if a.strip()]
+                        if len(addresses) > 1:
+                            # One rendered body and a single send for the whole group
+                            endpoint = "send_itinerary_email/bulk"
+                            payload = {
+                                "recipients": [{"email": a} for a in addresses],
+                                "itinerary": itinerary_data,
+                                "personal_message": message
+                            }
+                        else:
+                            endpoint = "send_itinerary_email"
+                            payload = {
+                                "email": email,
+                                "itinerary": itinerary_data,
+                                "personal_message": message
+                            }
                         
                         with st.spinner("Sending email..."):
                             try:
-                                res = requests.post(f"{FASTAPI_URL}/send_itinerary_email", json=payload)
-                                if res.status_code == 200:
-                                    st.success("✉️ Itinerary sent successfully! Check your inbox.")
+                                res = requests.post(f"{FASTAPI_URL}/{endpoint}", json=payload)
+                                if res.status_code == 202:
+                                    skipped = [r["email"] for r in res.json().get("recipients", []) if r["status"] != "queued"]
+                                    st.success("✉️ Itinerary queued for delivery! Check your inbox shortly.")
+                                    if skipped:
+                                        st.warning(f"Not sent to: {', '.join(skipped)}")
                                 else:
                                     st.error(f"Failed to send email: {res.json().get('detail', 'Unknown error')}")
                             except Exception as e: